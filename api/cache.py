@@ -0,0 +1,260 @@
+"""
+Pre-serialized response cache
+
+Every unparameterized endpoint returns the same body until the CV data
+changes, so the JSON is encoded once per data version and the ready-to-send
+bytes are reused for every request after that. Each body is also
+compressed once, at the highest levels, and the variant a client accepts
+is picked per request from `Accept-Encoding`.
+"""
+
+import gzip
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from logs import annotate
+from metrics import RESPONSE_CACHE_HIT, RESPONSE_CACHE_MISS
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip and identity are always served
+    brotli = None
+
+# Bodies smaller than this are not worth a compressed variant
+MIN_COMPRESS_SIZE = 512
+
+# Preferred encoding first when a client accepts several equally
+ENCODINGS = ("br", "gzip", "identity")
+
+# Entries kept per data version. Keys a client can vary (batch section sets)
+# could otherwise grow a version's cache without limit; past this, bodies
+# are encoded per request, uncompressed, and not kept.
+MAX_ENTRIES = 64
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode content exactly like FastAPI's default JSONResponse"""
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def yaml_dumper() -> type:
+    """
+    The fastest available safe YAML dumper
+
+    libyaml's emitter is an order of magnitude faster than the pure-Python
+    one. PyYAML is imported on first use as only the YAML export needs it.
+    """
+    import yaml
+
+    return getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def encode_yaml(content: Any) -> bytes:
+    """Render content as block-style YAML"""
+    import yaml
+
+    return yaml.dump(content, Dumper=yaml_dumper(), default_flow_style=False).encode("utf-8")
+
+
+def join_json_object(members: Iterable[Tuple[str, bytes]]) -> bytes:
+    """Encode a JSON object from already-encoded member values"""
+    return b"{" + b",".join(encode_json(key) + b":" + value for key, value in members) + b"}"
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    accepted: Dict[str, float] = {}
+    if not header:
+        return accepted
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(header: Optional[str], available: Dict[str, bytes]) -> str:
+    """
+    Pick the content coding to send from those available
+
+    Identity is always acceptable unless the client explicitly refuses it,
+    which is rare enough that we serve it anyway rather than a 406.
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*")
+    best, best_q = "identity", 0.0
+    for coding in ENCODINGS:
+        if coding not in available:
+            continue
+        if coding in accepted:
+            q = accepted[coding]
+        elif wildcard is not None:
+            q = wildcard
+        else:
+            # Unlisted identity is acceptable but least preferred
+            q = 0.001 if coding == "identity" else 0.0
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes) -> Dict[str, bytes]:
+    """Every worthwhile compressed variant of body, keyed by content coding"""
+    variants: Dict[str, bytes] = {}
+    if len(body) < MIN_COMPRESS_SIZE:
+        return variants
+
+    gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(gzipped) < len(body):
+        variants["gzip"] = gzipped
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            variants["br"] = compressed
+    return variants
+
+
+class BufferResponse(Response):
+    """A Response whose body may be any bytes-like object, e.g. a view of a shared mapping"""
+
+    def render(self, content: Any) -> Any:
+        return content
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A response body serialized and compressed once and served many times"""
+    body: bytes
+    media_type: str = "application/json"
+    variants: Optional[Dict[str, bytes]] = None
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str = "application/json", compressed: bool = True) -> "CachedResponse":
+        variants = compress(body) if compressed else {}
+        variants["identity"] = body
+        return cls(body, media_type, variants)
+
+    @property
+    def compressed(self) -> bool:
+        """False if compressed variants were skipped for a body worth compressing"""
+        return len(self.body) < MIN_COMPRESS_SIZE or len(self.variants or {}) > 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(variant) for variant in (self.variants or {"identity": self.body}).values())
+
+    def to_response(self, accept_encoding: Optional[str] = None) -> Response:
+        """Response carrying the best variant for the client's Accept-Encoding"""
+        variants = self.variants or {"identity": self.body}
+        coding = negotiate_encoding(accept_encoding, variants)
+        headers = {"Vary": "Accept-Encoding"}
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return BufferResponse(content=variants[coding], media_type=self.media_type, headers=headers)
+
+
+class ResponseCache:
+    """
+    Serialized responses for one data version
+
+    Entries are built lazily on first use. The cache is tied to the data
+    version it was created for; when the data changes a new cache is
+    created instead of invalidating entries one by one.
+
+    With compress=False entries are stored uncompressed until
+    `compress_entries()` is called, which lets a cold start serve its first
+    requests without waiting for brotli. At most `max_entries` entries are
+    kept.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        compress: bool = True,
+        entries: Optional[Dict[Hashable, CachedResponse]] = None,
+        max_entries: int = MAX_ENTRIES,
+    ):
+        self.version = version
+        self.compress = compress
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, CachedResponse] = dict(entries or {})
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = sum(entry.nbytes for entry in self._entries.values())
+
+    def get(
+        self,
+        key: Hashable,
+        build: Callable[[], Any],
+        encode: Callable[[Any], bytes] = encode_json,
+        media_type: str = "application/json",
+    ) -> CachedResponse:
+        """Return the cached response for key, encoding build() on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            RESPONSE_CACHE_HIT.inc()
+            annotate(cache="hit")
+            return entry
+
+        self.misses += 1
+        RESPONSE_CACHE_MISS.inc()
+        if len(self._entries) >= self.max_entries:
+            entry = CachedResponse.build(encode(build()), media_type, compressed=False)
+        else:
+            entry = CachedResponse.build(encode(build()), media_type, self.compress)
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+        # After build(), whose own lookups (a batch's sections) would otherwise
+        # overwrite the outcome of the request's outermost lookup
+        annotate(cache="miss")
+        return entry
+
+    def entries(self) -> Dict[Hashable, CachedResponse]:
+        """A copy of the entries built so far"""
+        return dict(self._entries)
+
+    def compress_entries(self) -> int:
+        """
+        Add the compressed variants skipped so far; returns how many entries changed
+
+        Blocking; run it in a worker thread. Each entry is replaced in a
+        single assignment, so concurrent readers see the old or new entry.
+        """
+        self.compress = True
+        changed = 0
+        for key, entry in list(self._entries.items()):
+            if entry.compressed:
+                continue
+            compressed = CachedResponse.build(entry.body, entry.media_type)
+            self._entries[key] = compressed
+            self.nbytes += compressed.nbytes - entry.nbytes
+            changed += 1
+        return changed
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
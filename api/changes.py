@@ -0,0 +1,73 @@
+"""
+Changes between CV data versions as JSON Patch
+
+`diff` turns two versions of the data into an RFC 6902 patch that
+transforms the older into the newer. Objects are compared key by key and
+lists index by index after trimming their common head and tail, so an
+entry added to the top of a list is a single `add` rather than a rewrite of
+every entry below it. Patches are not guaranteed minimal, only correct and
+small for the edits a CV typically sees.
+"""
+
+from typing import Any, Dict, List
+
+from search import escape_pointer
+
+Operation = Dict[str, Any]
+
+
+def same(old: Any, new: Any) -> bool:
+    """Equal as JSON, where unlike in Python 1, 1.0 and true all differ"""
+    if type(old) is not type(new):
+        return False
+    if isinstance(old, dict):
+        return old.keys() == new.keys() and all(same(value, new[key]) for key, value in old.items())
+    if isinstance(old, list):
+        return len(old) == len(new) and all(same(a, b) for a, b in zip(old, new))
+    return old == new
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[Operation]:
+    """Operations turning old into new, with pointers relative to path"""
+    operations: List[Operation] = []
+    _diff(old, new, path, operations)
+    return operations
+
+
+def _diff(old: Any, new: Any, path: str, operations: List[Operation]) -> None:
+    if same(old, new):
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                operations.append({"op": "remove", "path": f"{path}/{escape_pointer(key)}"})
+        for key, value in new.items():
+            pointer = f"{path}/{escape_pointer(key)}"
+            if key in old:
+                _diff(old[key], value, pointer, operations)
+            else:
+                operations.append({"op": "add", "path": pointer, "value": value})
+    elif isinstance(old, list) and isinstance(new, list):
+        _diff_lists(old, new, path, operations)
+    else:
+        operations.append({"op": "replace", "path": path, "value": new})
+
+
+def _diff_lists(old: List[Any], new: List[Any], path: str, operations: List[Operation]) -> None:
+    head = 0
+    while head < len(old) and head < len(new) and same(old[head], new[head]):
+        head += 1
+    tail = 0
+    while tail < len(old) - head and tail < len(new) - head and same(old[-1 - tail], new[-1 - tail]):
+        tail += 1
+
+    removed = old[head:len(old) - tail]
+    added = new[head:len(new) - tail]
+    common = min(len(removed), len(added))
+    # Changed entries in place, then the surplus inserted or removed where it starts
+    for offset in range(common):
+        _diff(removed[offset], added[offset], f"{path}/{head + offset}", operations)
+    for offset in range(common, len(added)):
+        operations.append({"op": "add", "path": f"{path}/{head + offset}", "value": added[offset]})
+    for _ in range(common, len(removed)):
+        operations.append({"op": "remove", "path": f"{path}/{head + common}"})
@@ -0,0 +1,127 @@
+"""
+Conditional GET
+
+Every CV data response is fully determined by the data version, the path
+and the query string, so its entity tag is a hash of those three and can be
+computed before the handler runs. A router-level dependency compares it
+with `If-None-Match` (or, failing that, `If-Modified-Since` against the
+data file's mtime) and answers 304 straight away when the client's copy is
+current, skipping the handler and any serialization.
+
+On the way out, `ConditionalMiddleware` adds `ETag`, `Last-Modified` and
+`Cache-Control` to successful responses. Compressed variants of a body are
+different representations, so the content coding is appended to the tag
+(`"<hash>-br"`); matching ignores that suffix, as any variant of the same
+version is a valid copy.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Key in the request state holding the validators of the current request
+STATE_KEY = "validators"
+
+
+@dataclass
+class Validators:
+    """Validators of the response a request is about to receive"""
+    etag: str
+    last_modified: str
+    # The client's tag when answering 304, echoed back as the response's tag
+    matched: Optional[str] = None
+
+
+def entity_tag(version: str, path: str, query: str) -> str:
+    """Opaque tag for the response at path and query in one data version"""
+    digest = hashlib.blake2b(digest_size=12)
+    for part in (version, path, query):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def canonical_query(request: Request) -> str:
+    """The query parameters in a stable order"""
+    return "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+
+
+def matching_tag(if_none_match: str, etag: str) -> Optional[str]:
+    """The tag in If-None-Match that matches etag, by weak comparison, ignoring any coding suffix"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return f'"{etag}"'
+        opaque = candidate[2:] if candidate.startswith("W/") else candidate
+        if opaque.strip('"').split("-", 1)[0] == etag:
+            return candidate
+    return None
+
+
+def modified_since(if_modified_since: str, mtime: int) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    # A date without a zone cannot be compared; treat the copy as stale
+    if since.tzinfo is None:
+        return True
+    return mtime > since.timestamp()
+
+
+def check_not_modified(request: Request, version: str, mtime: float) -> None:
+    """Record the request's validators and raise 304 if the client's copy is current"""
+    if request.method not in ("GET", "HEAD"):
+        return
+    validators = Validators(
+        entity_tag(version, request.url.path, canonical_query(request)),
+        formatdate(int(mtime), usegmt=True),
+    )
+    setattr(request.state, STATE_KEY, validators)
+
+    # If-Modified-Since is only consulted when If-None-Match is absent
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        validators.matched = matching_tag(if_none_match, validators.etag)
+        fresh = validators.matched is not None
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = if_modified_since is not None and not modified_since(if_modified_since, int(mtime))
+    if fresh:
+        raise HTTPException(status_code=304)
+
+
+class ConditionalMiddleware:
+    """ASGI middleware adding ETag, Last-Modified and Cache-Control to responses that have validators"""
+
+    def __init__(self, app: ASGIApp, cache_control: str = "no-cache"):
+        self.app = app
+        self.cache_control = cache_control
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] in (200, 304):
+                validators: Optional[Validators] = scope.get("state", {}).get(STATE_KEY)
+                if validators is not None:
+                    headers = MutableHeaders(scope=message)
+                    if message["status"] == 304:
+                        etag = validators.matched or f'"{validators.etag}"'
+                        headers["Vary"] = "Accept-Encoding"
+                    else:
+                        coding = headers.get("content-encoding")
+                        etag = f'"{validators.etag}-{coding}"' if coding else f'"{validators.etag}"'
+                    headers["ETag"] = etag
+                    headers["Last-Modified"] = validators.last_modified
+                    headers.setdefault("Cache-Control", self.cache_control)
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
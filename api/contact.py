@@ -0,0 +1,140 @@
+"""
+Contact form inbox
+
+Submissions are validated by the endpoint and put on a bounded in-memory
+queue; the request returns as soon as that is done. A single background
+task drains the queue in batches and writes each batch to SQLite in one
+transaction from a worker thread, so request handling never waits on disk.
+The database runs in WAL mode so batches commit with one fsync-light append.
+When the queue is full, `submit` refuses the message and the endpoint
+answers 503, pushing the backpressure to the client.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from models import ContactMessage
+
+logger = logging.getLogger(__name__)
+
+# Attempts to write one batch before its messages are dropped
+WRITE_ATTEMPTS = 3
+
+Row = Tuple[str, str, str, str, str, str]
+
+
+class InboxFull(Exception):
+    """The queue of unsaved messages is at capacity"""
+
+
+class ContactInbox:
+    """Bounded queue of contact messages, flushed to SQLite in batches"""
+
+    def __init__(self, path: Path, queue_size: int = 1000, batch_size: int = 100):
+        self.path = path
+        self.batch_size = batch_size
+        self.queue: "asyncio.Queue[Row]" = asyncio.Queue(maxsize=queue_size)
+        self.written = 0
+        self.batches = 0
+        self.rejected = 0
+        self.dropped = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        # Batch taken off the queue and not yet known to be saved
+        self._pending: List[Row] = []
+
+    def submit(self, message: ContactMessage) -> Tuple[str, datetime]:
+        """Queue a message without waiting; raises InboxFull under backpressure"""
+        message_id = uuid.uuid4().hex
+        received_at = datetime.utcnow()
+        try:
+            self.queue.put_nowait((
+                message_id, received_at.isoformat(), message.name, message.email, message.subject, message.message
+            ))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise InboxFull()
+        return message_id, received_at
+
+    async def start(self) -> None:
+        await run_in_threadpool(self._connect)
+        self._task = asyncio.create_task(self._flush_forever())
+
+    async def stop(self) -> None:
+        """Stop the flusher and save whatever is still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        # Writes are idempotent, so a batch interrupted mid-write is simply retried
+        if self._pending:
+            await self._flush(self._pending)
+        while not self.queue.empty():
+            await self._flush(self._take_batch(self.batch_size))
+        if self._connection is not None:
+            await run_in_threadpool(self._connection.close)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "written": self.written,
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+        }
+
+    def _connect(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Only the flusher uses the connection, one batch at a time, from the threadpool
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id TEXT PRIMARY KEY, received_at TEXT NOT NULL, name TEXT NOT NULL, "
+            "email TEXT NOT NULL, subject TEXT NOT NULL, message TEXT NOT NULL)"
+        )
+        connection.commit()
+        self._connection = connection
+
+    def _write(self, batch: List[Row]) -> None:
+        with self._connection:
+            self._connection.executemany("INSERT OR IGNORE INTO messages VALUES (?, ?, ?, ?, ?, ?)", batch)
+
+    def _take_batch(self, limit: int) -> List[Row]:
+        batch = []
+        while len(batch) < limit and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: List[Row]) -> None:
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                await run_in_threadpool(self._write, batch)
+            except sqlite3.Error as e:
+                logger.error(f"Saving {len(batch)} contact messages failed (attempt {attempt}): {e}")
+                if attempt < WRITE_ATTEMPTS:
+                    await asyncio.sleep(attempt)
+                continue
+            self.written += len(batch)
+            self.batches += 1
+            return
+        self.dropped += len(batch)
+
+    async def _flush_forever(self) -> None:
+        while True:
+            # Wait for the first message, then take whatever else has queued up
+            self._pending = [await self.queue.get()]
+            self._pending.extend(self._take_batch(self.batch_size - 1))
+            await self._flush(self._pending)
+            self._pending = []
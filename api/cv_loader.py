@@ -0,0 +1,112 @@
+"""
+Fast loading of cv-data.yml
+
+Parsing YAML is the slowest part of a cold start. `compile_snapshot` turns
+the YAML into a marshal-encoded binary snapshot stored next to it
+(`cv-data.yml.snap`), keyed by the SHA-256 of the YAML source and the
+Python version. Loaders use the snapshot while it matches the source
+byte for byte and otherwise fall back to libyaml's CSafeLoader, then to
+the pure-Python SafeLoader.
+
+Usage:
+    python api/cv_loader.py [path/to/cv-data.yml]
+"""
+
+import hashlib
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import Any, Optional, Union
+
+MAGIC = b"CVSNAP1\n"
+DIGEST_SIZE = 32
+
+# marshal's format is only stable within one Python version
+PYTHON_TAG = (sys.implementation.cache_tag or "unknown").encode("ascii")
+
+
+def snapshot_path(source: Union[str, Path]) -> Path:
+    """Where the compiled snapshot of source lives"""
+    source = Path(source)
+    return source.with_name(source.name + ".snap")
+
+
+def parse_yaml(raw: bytes) -> Any:
+    """Parse YAML with libyaml when available, else the pure-Python loader"""
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(raw, Loader=loader)
+
+
+def _header(digest: bytes) -> bytes:
+    return MAGIC + digest + bytes([len(PYTHON_TAG)]) + PYTHON_TAG
+
+
+def read_snapshot(path: Path, digest: bytes) -> Optional[Any]:
+    """The data in the snapshot at path, or None if it is missing or stale"""
+    try:
+        blob = path.read_bytes()
+    except OSError:
+        return None
+
+    header = _header(digest)
+    if not blob.startswith(header):
+        return None
+    try:
+        return marshal.loads(memoryview(blob)[len(header):])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def load_cv_bytes(raw: bytes, source: Union[str, Path], digest: Optional[bytes] = None) -> Any:
+    """
+    Load CV data from the raw YAML source bytes
+
+    The compiled snapshot is used when it was built from exactly these bytes.
+    """
+    digest = digest or hashlib.sha256(raw).digest()
+    data = read_snapshot(snapshot_path(source), digest)
+    if data is not None:
+        return data
+    return parse_yaml(raw)
+
+
+def load_cv_file(source: Union[str, Path]) -> Any:
+    """Load CV data from a YAML file, via its compiled snapshot when fresh"""
+    source = Path(source)
+    return load_cv_bytes(source.read_bytes(), source)
+
+
+def compile_snapshot(source: Union[str, Path]) -> Path:
+    """
+    Write the binary snapshot for source and return its path
+
+    Raises ValueError if the data holds values marshal cannot encode
+    (e.g. YAML timestamps).
+    """
+    source = Path(source)
+    raw = source.read_bytes()
+    payload = marshal.dumps(parse_yaml(raw))
+
+    target = snapshot_path(source)
+    temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(_header(hashlib.sha256(raw).digest()) + payload)
+    os.replace(temporary, target)
+    return target
+
+
+def main() -> int:
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent.parent / "data" / "cv-data.yml"
+    try:
+        target = compile_snapshot(source)
+    except (OSError, ValueError) as e:
+        print(f"Error compiling {source}: {e}")
+        return 1
+    print(f"✓ Compiled {source} -> {target} ({target.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
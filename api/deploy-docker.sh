@@ -43,6 +43,19 @@ echo -e "${GREEN}Found network: $CADDY_NETWORK${NC}"
 echo -e "${YELLOW}Step 3: Updating Docker network configuration...${NC}"
 sed -i "s/name: caddy_default/name: $CADDY_NETWORK/" docker-compose.vps.yml
 
+# Caddy's address on that network, the only proxy whose X-Forwarded-For is trusted
+CADDY_CONTAINER=${CADDY_CONTAINER:-caddy}
+if [ -z "$CADDY_IP" ]; then
+    CADDY_IP=$(docker inspect -f "{{with index .NetworkSettings.Networks \"$CADDY_NETWORK\"}}{{.IPAddress}}{{end}}" "$CADDY_CONTAINER" 2>/dev/null || true)
+fi
+if [ -z "$CADDY_IP" ]; then
+    echo -e "${YELLOW}Could not find the address of container '$CADDY_CONTAINER' on $CADDY_NETWORK.${NC}"
+    echo -e "${YELLOW}Set CADDY_IP (or CADDY_CONTAINER) and rerun, or all visitors share one rate limit.${NC}"
+else
+    echo -e "${GREEN}Trusting X-Forwarded-For from Caddy at $CADDY_IP${NC}"
+fi
+export CADDY_IP
+
 # 4. Stop existing container if running
 echo -e "${YELLOW}Step 4: Checking for existing container...${NC}"
 if docker ps -a | grep -q $CONTAINER_NAME; then
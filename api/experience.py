@@ -0,0 +1,172 @@
+"""
+Pre-parsed, indexed experience entries
+
+Periods such as "Feb 2016 – Present" are parsed into dates once when a
+snapshot is built, and entries are indexed by organization, type, start
+year and end year. Filtering a request is then a handful of index lookups
+and a set intersection instead of a rescan of every entry.
+
+Organizations are matched case-insensitively against the start of any word
+in the name ("curtin" and "univ" both find "Curtin University"), through a
+sorted list of each name's word suffixes searched with one bisect.
+"""
+
+import bisect
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from models import ExperienceType
+from suggest import normalize, word_suffixes
+
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"],
+        start=1,
+    )
+}
+
+OPEN_ENDED = {"present", "current", "ongoing", "now"}
+
+# Keywords in the title or organization that identify each type, checked in order
+TYPE_KEYWORDS: Tuple[Tuple[ExperienceType, Tuple[str, ...]], ...] = (
+    (ExperienceType.military, ("ran", "hqadf", "adf", "navy", "army", "air force", "defence", "submarine")),
+    (ExperienceType.consulting, ("consultant", "consulting", "contractor", "self-employed", "freelance")),
+    (ExperienceType.academic, ("university", "lecturer", "researcher", "professor", "college", "tutor")),
+)
+
+_range_re = re.compile(r"\s*[–—-]\s*")
+_date_re = re.compile(r"^(?:(?P<month>[a-z]{3})[a-z]*\.?\s+)?(?P<year>\d{4})$")
+
+
+def parse_date(text: str, end: bool = False) -> Optional[date]:
+    """Parse "Feb 2016" or "2019"; a bare year means January, or December for an end date"""
+    match = _date_re.match(text.strip().lower())
+    if not match:
+        return None
+    year = int(match.group("year"))
+    if match.group("month") is None:
+        return date(year, 12 if end else 1, 1)
+    month = MONTHS.get(match.group("month"))
+    return date(year, month, 1) if month else None
+
+
+def parse_period(period: str) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Parse a period string into (start, end) month dates
+
+    An open-ended period ("Feb 2016 – Present", "Ongoing") has no end date,
+    and a period with no parseable start has no start date.
+    """
+    parts = _range_re.split(period.strip(), maxsplit=1)
+    if len(parts) == 1:
+        if parts[0].lower() in OPEN_ENDED:
+            return None, None
+        single = parse_date(parts[0])
+        return single, parse_date(parts[0], end=True)
+
+    start_text, end_text = parts
+    start = parse_date(start_text)
+    end = None if end_text.strip().lower() in OPEN_ENDED else parse_date(end_text, end=True)
+    return start, end
+
+
+def classify(entry: Dict[str, Any]) -> ExperienceType:
+    """Experience type from an explicit `type` key, else from title/organization keywords"""
+    explicit = str(entry.get("type", "")).lower()
+    if explicit in ExperienceType.__members__:
+        return ExperienceType(explicit)
+
+    words = f"{entry.get('title', '')} {entry.get('organization', '')}".lower()
+    for experience_type, keywords in TYPE_KEYWORDS:
+        if any(re.search(rf"\b{re.escape(keyword)}\b", words) for keyword in keywords):
+            return experience_type
+    return ExperienceType.industry
+
+
+@dataclass(frozen=True)
+class ExperienceRecord:
+    """One experience entry with its parsed period and type"""
+    entry: Dict[str, Any]
+    start: Optional[date]
+    end: Optional[date]
+    type: ExperienceType
+
+
+class ExperienceStore:
+    """Experience entries indexed by organization, type and period"""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.records: List[ExperienceRecord] = []
+        self.by_type: Dict[ExperienceType, List[int]] = {}
+
+        for index, entry in enumerate(entries):
+            start, end = parse_period(str(entry.get("period", "")))
+            record = ExperienceRecord(entry, start, end, classify(entry))
+            self.records.append(record)
+            self.by_type.setdefault(record.type, []).append(index)
+
+        # (word suffix of an organization name, index), sorted
+        self._organizations = sorted(
+            (key, index)
+            for index, entry in enumerate(entries)
+            for key, _ in word_suffixes(normalize(str(entry.get("organization", ""))))
+        )
+
+        # (year, index) pairs sorted by year; unknown starts sort first and
+        # open ends sort last so they match any year bound
+        self._starts = sorted(
+            (record.start.year if record.start else 0, index)
+            for index, record in enumerate(self.records)
+        )
+        self._ends = sorted(
+            (record.end.year if record.end else 9999, index)
+            for index, record in enumerate(self.records)
+        )
+
+    def match_organization(self, query: str) -> Set[int]:
+        """Indexes of entries with a word in their organization name starting with query"""
+        prefix = normalize(query)
+        matched: Set[int] = set()
+        position = bisect.bisect_left(self._organizations, (prefix, -1))
+        while position < len(self._organizations) and self._organizations[position][0].startswith(prefix):
+            matched.add(self._organizations[position][1])
+            position += 1
+        return matched
+
+    def filter(
+        self,
+        type: Optional[ExperienceType] = None,
+        organization: Optional[str] = None,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Entries matching every given filter, in their original order
+
+        The year filters select entries whose period overlaps the range
+        year_start..year_end.
+        """
+        candidates: List[Set[int]] = []
+
+        if type is not None:
+            candidates.append(set(self.by_type.get(type, ())))
+        if organization is not None:
+            candidates.append(self.match_organization(organization))
+        if year_end is not None:
+            # Started on or before the end of the range
+            cut = bisect.bisect_right(self._starts, (year_end, len(self.records)))
+            candidates.append({index for _, index in self._starts[:cut]})
+        if year_start is not None:
+            # Ended on or after the start of the range
+            cut = bisect.bisect_left(self._ends, (year_start, -1))
+            candidates.append({index for _, index in self._ends[cut:]})
+
+        if not candidates:
+            return [record.entry for record in self.records]
+
+        candidates.sort(key=len)
+        matched = set.intersection(*candidates)
+        return [self.records[index].entry for index in sorted(matched)]
@@ -0,0 +1,187 @@
+"""
+Admission control
+
+Two cheap checks run before a request reaches the app:
+
+* A per-client token bucket. Each client's bucket refills continuously at
+  the configured rate, and a request that finds it empty gets 429. Buckets
+  live in an LRU table of fixed size, so every check is O(1) and a flood of
+  distinct clients evicts the least recently seen instead of growing memory.
+* A concurrency limit. At most `limit` requests run at once; up to
+  `queue_size` more wait their turn in FIFO order for at most
+  `queue_timeout` seconds. Anything beyond that is shed immediately with
+  503, so a burst costs the excess requests a fast rejection rather than
+  raising every request's latency together.
+
+Both rejections carry `Retry-After`.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets in a bounded LRU table"""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None, max_clients: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or rate_per_minute)
+        self.max_clients = max_clients
+        # client -> (tokens, monotonic time they were counted)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.limited = 0
+        self.evictions = 0
+
+    def acquire(self, client: str) -> float:
+        """Take a token for client; return 0 if admitted, else seconds until one is available"""
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            tokens = self.capacity
+            if len(self._buckets) >= self.max_clients:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            tokens, counted_at = bucket
+            tokens = min(self.capacity, tokens + (now - counted_at) * self.rate)
+            self._buckets.move_to_end(client)
+
+        if tokens >= 1.0:
+            self._buckets[client] = (tokens - 1.0, now)
+            return 0.0
+        self._buckets[client] = (tokens, now)
+        self.limited += 1
+        return (1.0 - tokens) / self.rate
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_minute": self.rate * 60.0,
+            "burst": self.capacity,
+            "clients": len(self._buckets),
+            "limited": self.limited,
+            "evictions": self.evictions,
+        }
+
+
+class ConcurrencyLimiter:
+    """A counting semaphore with a bounded FIFO wait queue"""
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; False if the request is shed"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            # A slot is handed over by release() resolving the future
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._forget(waiter)
+            raise
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        # release() may already have popped (and skipped) a cancelled waiter
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self) -> None:
+        """Hand the slot to the longest-waiting request, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying rate and concurrency limits to HTTP requests"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        concurrency: Optional[ConcurrencyLimiter] = None,
+        rate_limiter: Optional[TokenBucketLimiter] = None,
+        exempt_paths: Iterable[str] = (),
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+        self.exempt_paths = frozenset(exempt_paths)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self.rate_limiter is not None:
+            client = scope.get("client")
+            wait = self.rate_limiter.acquire(client[0] if client else "unknown")
+            if wait:
+                await self._reject(429, "Too many requests", math.ceil(wait), scope, receive, send)
+                return
+
+        if self.concurrency is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.concurrency.acquire():
+            await self._reject(503, "Server busy", self.retry_after, scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.concurrency.release()
+
+    @staticmethod
+    async def _reject(status: int, error: str, retry_after: int, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            status_code=status,
+            content={"error": error, "message": f"Retry in {retry_after} seconds"},
+            headers={"Retry-After": str(retry_after)},
+        )
+        await response(scope, receive, send)
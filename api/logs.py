@@ -0,0 +1,175 @@
+"""
+Non-blocking structured logging
+
+Log calls on the request path only put the record on a bounded in-memory
+queue; a `QueueListener` thread formats it as one JSON line and writes it
+out. When the queue is full (stdout or the disk cannot keep up), the record
+is dropped and counted rather than making the request wait.
+
+`AccessLogMiddleware` writes one access record per request with its
+route, status, latency, size, tenant and whether the response came from
+the response cache. Code handling the request adds to its record with
+`annotate()`.
+"""
+
+import copy
+import json
+import logging
+import queue
+import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+access_logger = logging.getLogger("access")
+
+# Fields of the access record of the request being handled
+_access_record: ContextVar[Optional[Dict[str, Any]]] = ContextVar("access_record", default=None)
+
+
+def annotate(**fields: Any) -> None:
+    """Add fields to the current request's access record, if it has one"""
+    record = _access_record.get()
+    if record is not None:
+        record.update(fields)
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record; a record's `fields` extra is merged in"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops and counts records instead of blocking on a full queue"""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.setFormatter(JSONFormatter())
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        A copy of record for the queue, left for the writer thread to format
+
+        Only a traceback is rendered here, since the exception would keep its
+        frames alive until the record is written. The base class would
+        format the whole record instead and fold the traceback into its
+        message.
+        """
+        record = copy.copy(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """The root logger's queue, and the thread draining it to a stream as JSON"""
+
+    def __init__(self, level: str = "INFO", queue_size: int = 10000, stream: Any = None):
+        self.queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+        self.handler = DroppingQueueHandler(self.queue)
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JSONFormatter())
+        self.listener = QueueListener(self.queue, output, respect_handler_level=True)
+        self.level = level.upper()
+        self.running = False
+
+    def install(self) -> None:
+        """Route every logger through the queue and start the writer thread"""
+        root = logging.getLogger()
+        root.handlers = [self.handler]
+        root.setLevel(self.level)
+        self.start()
+
+    def start(self) -> None:
+        if not self.running:
+            self.listener.start()
+            self.running = True
+
+    def stop(self) -> None:
+        """Write out what is queued and stop the writer thread"""
+        if self.running:
+            self.listener.stop()
+            self.running = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "dropped": self.handler.dropped,
+        }
+
+
+class AccessLogMiddleware:
+    """ASGI middleware writing one structured access record per request"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_counting(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        record: Dict[str, Any] = {"cache": None}
+        token = _access_record.set(record)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            elapsed = time.perf_counter() - start
+            _access_record.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            client = scope.get("client")
+            access_logger.info(
+                "%s %s %d", scope["method"], scope["path"], status,
+                extra={"fields": {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route,
+                    "status": status,
+                    "latency_ms": round(elapsed * 1000, 3),
+                    "bytes": size,
+                    "tenant": scope.get("path_params", {}).get("tenant"),
+                    "client": client[0] if client else None,
+                    **record,
+                }},
+            )
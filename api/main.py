@@ -3,17 +3,48 @@ FastAPI Resume API
 Real-time API access to Michael Borck's resume data
 """
 
-from fastapi import FastAPI, HTTPException
+import time
+IMPORTS_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Path as PathParam
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pathlib import Path
-import yaml
-from typing import Dict, Any, Optional
+import asyncio
+import os
+from typing import Optional
 import logging
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from conditional import ConditionalMiddleware
+from contact import ContactInbox
+from limits import AdmissionMiddleware, ConcurrencyLimiter, TokenBucketLimiter
+from logs import AccessLogMiddleware, LogPipeline
+from metrics import CACHE_LOOKUPS, CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, Counter, Gauge, MetricsMiddleware
+from profiling import ProfilerMiddleware, RequestProfiler
+from projection import compile_projection
+from routers.admin import create_admin_router
+from routers.contact import create_contact_router
+from routers.cv import create_router
+from shared import SharedStore
+from snapshot import SnapshotHolder, find_data_file
+from starlette.concurrency import run_in_threadpool
+from startup import OPENAPI_FILE, StartupTimer, load_openapi
+from tenants import TENANT_PATTERN, TenantLoadError, TenantNotFound, TenantRegistry
+
+# Startup phase durations, logged once the data is loaded
+startup_timer = StartupTimer()
+startup_timer.record("imports", time.perf_counter() - IMPORTS_STARTED)
+APP_SETUP_STARTED = time.perf_counter()
+
+# Logs are queued (at most LOG_QUEUE_SIZE records, then dropped) and written
+# as JSON lines to stdout from a background thread
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+ACCESS_LOG = os.getenv("ACCESS_LOG", "true").lower() in ("1", "true", "yes")
+
+log_pipeline = LogPipeline(level=LOG_LEVEL, queue_size=LOG_QUEUE_SIZE)
+log_pipeline.install()
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
@@ -34,6 +65,56 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Sampling profiler, off unless PROFILER_ENABLED or switched on at /admin/profiler
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0.01"))
+
+# Key for the /admin endpoints (unset disables them)
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+profiler = RequestProfiler(enabled=PROFILER_ENABLED, sample_rate=PROFILER_SAMPLE_RATE)
+
+# Innermost, so only the app itself is profiled
+app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
+# Seconds clients may reuse a CV response before revalidating it with its
+# ETag (0: always revalidate)
+CACHE_MAX_AGE = int(os.getenv("CV_CACHE_MAX_AGE", "60"))
+
+app.add_middleware(
+    ConditionalMiddleware,
+    cache_control=f"public, max-age={CACHE_MAX_AGE}" if CACHE_MAX_AGE > 0 else "no-cache",
+)
+
+# Admission control: requests beyond CONCURRENCY_LIMIT wait in a queue of
+# CONCURRENCY_QUEUE for up to CONCURRENCY_QUEUE_TIMEOUT seconds, then get 503
+CONCURRENCY_LIMIT = int(os.getenv("CONCURRENCY_LIMIT", "32"))
+CONCURRENCY_QUEUE = int(os.getenv("CONCURRENCY_QUEUE", "64"))
+CONCURRENCY_QUEUE_TIMEOUT = float(os.getenv("CONCURRENCY_QUEUE_TIMEOUT", "2"))
+
+# Per-client token buckets refilled at RATE_LIMIT_PER_MINUTE
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "100"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "0")) or None
+RATE_LIMIT_CLIENTS = int(os.getenv("RATE_LIMIT_CLIENTS", "10000"))
+
+concurrency_limiter: Optional[ConcurrencyLimiter] = (
+    ConcurrencyLimiter(CONCURRENCY_LIMIT, CONCURRENCY_QUEUE, CONCURRENCY_QUEUE_TIMEOUT)
+    if CONCURRENCY_LIMIT > 0 else None
+)
+rate_limiter: Optional[TokenBucketLimiter] = (
+    TokenBucketLimiter(RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST, max_clients=RATE_LIMIT_CLIENTS)
+    if RATE_LIMIT_ENABLED else None
+)
+
+# Added before CORS so rejections still carry CORS headers
+app.add_middleware(
+    AdmissionMiddleware,
+    concurrency=concurrency_limiter,
+    rate_limiter=rate_limiter,
+    exempt_paths=("/health", "/metrics"),
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -49,35 +130,117 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global variable to store CV data
-cv_data: Dict[str, Any] = {}
+# Outermost, so shed and rate-limited requests are counted too
+app.add_middleware(MetricsMiddleware)
+if ACCESS_LOG:
+    app.add_middleware(AccessLogMiddleware)
+
+# Seconds between checks of cv-data.yml for changes (0 disables hot reload)
+RELOAD_INTERVAL = float(os.getenv("CV_RELOAD_INTERVAL", "2"))
+
+# Earlier data versions kept so pagination cursors survive a reload and
+# /changes can diff against them
+SNAPSHOT_HISTORY = int(os.getenv("CV_SNAPSHOT_HISTORY", "4"))
+
+# Directory of per-tenant CV files served at /{tenant}/... (unset disables)
+TENANTS_DIR = os.getenv("CV_TENANTS_DIR")
+TENANTS_MAX = int(os.getenv("CV_TENANTS_MAX", "64"))
+TENANTS_MAX_BYTES = int(os.getenv("CV_TENANTS_MAX_MB", "64")) * 1024 * 1024
+
+# Serve the first requests before compressing the cached responses, which
+# then happens in the background (for scale-to-zero deployments)
+FAST_STARTUP = os.getenv("CV_FAST_STARTUP", "false").lower() in ("1", "true", "yes")
+
+# Directory for snapshot generations shared by all uvicorn workers, ideally
+# on tmpfs such as /dev/shm (unset: each worker loads privately), holding
+# at most CV_SHARED_MAX_MB of generations (0: unbounded)
+SHARED_DIR = os.getenv("CV_SHARED_DIR")
+SHARED_MAX_BYTES = int(os.getenv("CV_SHARED_MAX_MB", "256")) * 1024 * 1024
+shared_store: Optional[SharedStore] = (
+    SharedStore(Path(SHARED_DIR), keep=SNAPSHOT_HISTORY, max_bytes=SHARED_MAX_BYTES) if SHARED_DIR else None
+)
+
+# SQLite database for contact form messages, written in batches of
+# CONTACT_BATCH_SIZE from a queue of at most CONTACT_QUEUE_SIZE
+CONTACT_DB = Path(os.getenv("CV_CONTACT_DB", Path(__file__).parent / "contact-messages.db"))
+CONTACT_QUEUE_SIZE = int(os.getenv("CONTACT_QUEUE_SIZE", "1000"))
+CONTACT_BATCH_SIZE = int(os.getenv("CONTACT_BATCH_SIZE", "100"))
+contact_inbox = ContactInbox(CONTACT_DB, queue_size=CONTACT_QUEUE_SIZE, batch_size=CONTACT_BATCH_SIZE)
+
+# Holder of the current CV data snapshot, created on startup
+data_holder: Optional[SnapshotHolder] = None
+reload_task: Optional[asyncio.Task] = None
+compress_task: Optional[asyncio.Future] = None
+
+# Lazily loaded tenant snapshots
+tenant_registry: Optional[TenantRegistry] = (
+    TenantRegistry(
+        Path(TENANTS_DIR),
+        max_tenants=TENANTS_MAX,
+        max_bytes=TENANTS_MAX_BYTES,
+        check_interval=RELOAD_INTERVAL,
+        history_size=SNAPSHOT_HISTORY,
+        store=shared_store,
+    )
+    if TENANTS_DIR else None
+)
 
 @app.on_event("startup")
 async def startup_event():
-    """Load CV data from YAML file on startup"""
+    """Load CV data from YAML file on startup and start watching it for changes"""
+    global data_holder, reload_task, compress_task
     try:
-        # Try Docker path first, then local development path
-        docker_path = Path("/app/data/cv-data.yml")
-        local_path = Path(__file__).parent.parent / "data" / "cv-data.yml"
-        
-        if docker_path.exists():
-            yaml_path = docker_path
-        elif local_path.exists():
-            yaml_path = local_path
-        else:
-            logger.error(f"CV data file not found at {docker_path} or {local_path}")
-            raise FileNotFoundError(f"CV data file not found at {docker_path} or {local_path}")
-        
-        with open(yaml_path, 'r', encoding='utf-8') as file:
-            global cv_data
-            cv_data = yaml.safe_load(file)
-            
-        logger.info(f"Successfully loaded CV data from {yaml_path}")
-        logger.info(f"Data keys: {list(cv_data.keys())}")
+        with startup_timer.phase("data"):
+            yaml_path = find_data_file()
+            data_holder = SnapshotHolder(yaml_path, history_size=SNAPSHOT_HISTORY, store=shared_store)
+            snapshot = await data_holder.load(fast=FAST_STARTUP)
+
+        logger.info(f"Successfully loaded CV data from {yaml_path} (version {snapshot.version[:12]})")
+        logger.info(f"Data keys: {list(snapshot.data.keys())}")
     except Exception as e:
         logger.error(f"Failed to load CV data: {e}")
         raise
 
+    with startup_timer.phase("openapi"):
+        prebuilt = load_openapi(app)
+    if prebuilt:
+        logger.info(f"Using prebuilt OpenAPI schema {OPENAPI_FILE}")
+
+    if FAST_STARTUP:
+        compress_task = asyncio.ensure_future(run_in_threadpool(snapshot.responses.compress_entries))
+    if RELOAD_INTERVAL > 0:
+        reload_task = asyncio.create_task(data_holder.watch(RELOAD_INTERVAL))
+    await contact_inbox.start()
+
+    logger.info(f"Startup: {startup_timer.summary()}", extra={"fields": {"startup_ms": startup_timer.milliseconds()}})
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop watching the CV data file and save queued contact messages"""
+    if reload_task is not None:
+        reload_task.cancel()
+    await contact_inbox.stop()
+    log_pipeline.stop()
+
+def default_holder() -> SnapshotHolder:
+    """Return the holder of the default CV, or 503 if it is not loaded yet"""
+    if data_holder is None:
+        raise HTTPException(status_code=503, detail="CV data not loaded")
+    return data_holder
+
+async def tenant_holder(
+    tenant: str = PathParam(..., pattern=TENANT_PATTERN, description="Tenant whose CV to read")
+) -> SnapshotHolder:
+    """Return the holder of a tenant's CV, loading it on first access"""
+    if tenant_registry is None:
+        raise HTTPException(status_code=404, detail="Multi-tenant serving is not enabled")
+    try:
+        return await tenant_registry.get(tenant)
+    except TenantNotFound:
+        raise HTTPException(status_code=404, detail=f"Tenant '{tenant}' not found")
+    except TenantLoadError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 @app.get("/", tags=["General"])
 async def root():
     """API root endpoint with information about available endpoints"""
@@ -90,11 +253,19 @@ async def root():
             "profile": "/profile - Basic profile information",
             "experience": "/experience - Work history and experience",
             "skills": "/skills - Technical skills and expertise",
+            "skill_suggestions": "/skills/suggest?q= - Autocomplete skill names",
             "education": "/education - Educational background",
             "projects": "/projects - Notable projects",
             "publications": "/publications - Books and publications",
             "achievements": "/achievements - Key achievements",
-            "contact": "/contact - Contact information",
+            "contact": "/contact - Contact information (GET) and contact form (POST)",
+            "batch": "/batch?sections=profile,skills - Several sections in one response",
+            "search": "/search?q= - Full-text search across the CV",
+            "semantic_search": "/search/semantic?q= - Search by meaning",
+            "changes": "/changes?since=<version> - JSON Patch from an earlier data version",
+            "export": "/export - Complete CV as JSON or YAML",
+            "metrics": "/metrics - Prometheus metrics",
+            "tenants": "/{tenant}/profile, /{tenant}/experience, ... - Same endpoints for a hosted tenant's CV",
         },
         "source": "https://github.com/michael-borck/resume.michaelborck.dev",
         "timestamp": datetime.utcnow().isoformat()
@@ -106,178 +277,78 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "data_loaded": bool(cv_data)
+        "data_loaded": data_holder is not None and data_holder.current is not None,
+        **(data_holder.status() if data_holder is not None else {}),
+        "tenants": tenant_registry.stats() if tenant_registry is not None else None,
+        "concurrency": concurrency_limiter.stats() if concurrency_limiter is not None else None,
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else None,
+        "contact": contact_inbox.stats(),
+        "logging": log_pipeline.stats()
     }
 
-@app.get("/profile", tags=["Profile"])
-async def get_profile():
-    """Get basic profile information"""
-    if not cv_data:
-        raise HTTPException(status_code=503, detail="CV data not loaded")
-    
-    personal = cv_data.get('personal', {})
-    summary = cv_data.get('summary', {})
-    
-    return {
-        "name": personal.get('name'),
-        "email": personal.get('email'),
-        "phone": personal.get('phone'),
-        "location": personal.get('location'),
-        "linkedin": personal.get('linkedin'),
-        "github": personal.get('github'),
-        "portfolio": personal.get('portfolio'),
-        "education_platform": personal.get('education_platform'),
-        "summary": summary.get('main'),
-        "tagline": "Make Contact Count",
-        "years_experience": 25,
-        "books_published": 4
-    }
+@app.get("/metrics", tags=["General"])
+async def metrics():
+    """Prometheus metrics for this worker"""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
 
-@app.get("/experience", tags=["Experience"])
-async def get_experience(
-    type: Optional[str] = None,
-    limit: Optional[int] = None
-):
-    """
-    Get work experience
-    
-    - **type**: Filter by experience type (academic, consulting, military)
-    - **limit**: Limit number of results
-    """
-    if not cv_data:
-        raise HTTPException(status_code=503, detail="CV data not loaded")
-    
-    experience = cv_data.get('experience', [])
-    
-    # Filter by type if specified
-    if type:
-        experience = [exp for exp in experience if type.lower() in str(exp).lower()]
-    
-    # Limit results if specified
-    if limit and limit > 0:
-        experience = experience[:limit]
-    
-    return {
-        "total": len(experience),
-        "filters": {
-            "type": type,
-            "limit": limit
-        },
-        "data": experience
-    }
+@REGISTRY.collector
+def collect_state():
+    """Data, cache and limiter state read at scrape time"""
+    reloads = Counter("cv_data_reloads_total", "Reloads that swapped in a new data version")
+    entries = Gauge("cv_response_cache_entries", "Cached responses for the current data version")
+    cache_bytes = Gauge("cv_response_cache_bytes", "Bytes held by the current response cache")
+    hit_ratio = Gauge("cv_cache_hit_ratio", "Fraction of lookups that hit, by cache", ("cache",))
+    rejections = Counter("cv_admission_rejections_total", "Requests rejected before reaching the app", ("reason",))
+    waiting = Gauge("cv_admission_waiting", "Requests waiting for a concurrency slot")
+    contact_queued = Gauge("cv_contact_queued", "Contact messages waiting to be saved")
+    contact_messages = Counter("cv_contact_messages_total", "Contact messages by outcome", ("result",))
+    logs_dropped = Counter("cv_log_records_dropped_total", "Log records dropped because the log queue was full")
 
-@app.get("/skills", tags=["Skills"])
-async def get_skills(category: Optional[str] = None):
-    """
-    Get technical skills
-    
-    - **category**: Filter by category (programming, certifications, etc.)
-    """
-    if not cv_data:
-        raise HTTPException(status_code=503, detail="CV data not loaded")
-    
-    skills = cv_data.get('skills', {})
-    
-    if category:
-        if category in skills:
-            return {
-                "category": category,
-                "data": skills[category]
-            }
-        else:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Category '{category}' not found. Available: {list(skills.keys())}"
-            )
-    
-    return skills
-
-@app.get("/education", tags=["Education"])
-async def get_education():
-    """Get educational background"""
-    if not cv_data:
-        raise HTTPException(status_code=503, detail="CV data not loaded")
-    
-    return {
-        "education": cv_data.get('education', [])
-    }
+    if data_holder is not None:
+        reloads.inc(data_holder.reload_count)
+        if data_holder.current is not None:
+            entries.set(len(data_holder.current.responses))
+            cache_bytes.set(data_holder.current.responses.nbytes)
 
-@app.get("/projects", tags=["Projects"])
-async def get_projects():
-    """Get list of projects"""
-    if not cv_data:
-        raise HTTPException(status_code=503, detail="CV data not loaded")
-    
-    return {
-        "projects": cv_data.get('projects', [])
-    }
+    # Caches that count their own lookups are mirrored into cv_cache_lookups_total
+    if tenant_registry is not None:
+        stats = tenant_registry.stats()
+        CACHE_LOOKUPS.labels("tenant", "hit").set(stats["hits"])
+        CACHE_LOOKUPS.labels("tenant", "miss").set(stats["misses"])
+    info = compile_projection.cache_info()
+    CACHE_LOOKUPS.labels("projection", "hit").set(info.hits)
+    CACHE_LOOKUPS.labels("projection", "miss").set(info.misses)
+    for cache in ("response", "tenant", "projection"):
+        hits = CACHE_LOOKUPS.labels(cache, "hit").value
+        total = hits + CACHE_LOOKUPS.labels(cache, "miss").value
+        if total:
+            hit_ratio.labels(cache).set(hits / total)
 
-@app.get("/publications", tags=["Publications"])
-async def get_publications():
-    """Get publications including books and papers"""
-    if not cv_data:
-        raise HTTPException(status_code=503, detail="CV data not loaded")
-    
-    publications = cv_data.get('publications', {})
-    return {
-        "books": publications.get('books', []),
-        "thesis": publications.get('thesis', []),
-        "conferences": publications.get('conferences', []),
-        "honours": publications.get('honours', [])
-    }
+    if concurrency_limiter is not None:
+        stats = concurrency_limiter.stats()
+        rejections.labels("queue_full").inc(stats["rejected"])
+        rejections.labels("queue_timeout").inc(stats["timed_out"])
+        waiting.set(stats["waiting"])
+    if rate_limiter is not None:
+        rejections.labels("rate_limited").inc(rate_limiter.limited)
 
-@app.get("/achievements", tags=["Achievements"])
-async def get_achievements():
-    """Get key achievements"""
-    if not cv_data:
-        raise HTTPException(status_code=503, detail="CV data not loaded")
-    
-    return {
-        "achievements": cv_data.get('achievements', [])
-    }
+    stats = contact_inbox.stats()
+    contact_queued.set(stats["queued"])
+    for result in ("written", "rejected", "dropped"):
+        contact_messages.labels(result).inc(stats[result])
+    logs_dropped.inc(log_pipeline.handler.dropped)
+    return [
+        reloads, entries, cache_bytes, hit_ratio, rejections, waiting,
+        contact_queued, contact_messages, logs_dropped,
+    ]
 
-@app.get("/contact", tags=["Contact"])
-async def get_contact():
-    """Get contact information"""
-    if not cv_data:
-        raise HTTPException(status_code=503, detail="CV data not loaded")
-    
-    personal = cv_data.get('personal', {})
-    
-    return {
-        "email": personal.get('email'),
-        "phone": personal.get('phone'),
-        "linkedin": personal.get('linkedin'),
-        "github": personal.get('github'),
-        "location": personal.get('location'),
-        "portfolio": personal.get('portfolio'),
-        "education_platform": personal.get('education_platform')
-    }
+app.include_router(create_router(default_holder))
+app.include_router(create_contact_router(contact_inbox))
+if ADMIN_API_KEY:
+    app.include_router(create_admin_router(ADMIN_API_KEY, profiler))
+app.include_router(create_router(tenant_holder), prefix="/{tenant}", tags=["Tenants"])
 
-@app.get("/export", tags=["Export"])
-async def export_cv(format: str = "json"):
-    """
-    Export complete CV data
-    
-    - **format**: Export format (json or yaml)
-    """
-    if not cv_data:
-        raise HTTPException(status_code=503, detail="CV data not loaded")
-    
-    if format.lower() == "json":
-        return cv_data
-    elif format.lower() == "yaml":
-        # Return YAML as plain text
-        from fastapi.responses import PlainTextResponse
-        return PlainTextResponse(
-            yaml.dump(cv_data, default_flow_style=False),
-            media_type="text/yaml"
-        )
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid format '{format}'. Supported: json, yaml"
-        )
+startup_timer.record("app setup", time.perf_counter() - APP_SETUP_STARTED)
 
 # Error handlers
 @app.exception_handler(404)
@@ -0,0 +1,227 @@
+"""
+In-process metrics in the Prometheus text format
+
+Each worker keeps its own registry. Requests are handled on the event loop
+thread, so recording a sample is a plain dict lookup and integer add with no
+locking. Series for a label set are created on first use and looked up by
+tuple afterwards; `labels()` returns the series itself so hot paths can bind
+it once. Values that already live elsewhere (tenant and limiter counters)
+are read by collectors at scrape time instead of being mirrored.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Starlette appends the charset to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Value:
+    """One counter or gauge series"""
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _Buckets:
+    """One histogram series; bucket counts are cumulated when rendered"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    """A named metric family with a fixed set of label names"""
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _new_series(self) -> object:
+        return _Value()
+
+    def labels(self, *values: str):
+        """The series for these label values, created on first use"""
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = self._new_series()
+        return series
+
+    def _samples(self) -> Iterable[str]:
+        for values, series in self._series.items():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(series.value)}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterable[str]:
+        names = self.labelnames + ("le",)
+        for values, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, values + (_format_value(bound),))} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(series.sum)}"
+            yield f"{self.name}_count{labels} {series.count}"
+
+
+class Registry:
+    """Metrics of one worker, plus collectors producing metrics at scrape time"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], Iterable[Metric]]) -> Callable[[], Iterable[Metric]]:
+        """Register a function returning freshly filled metrics on every scrape"""
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        # Collectors run first as they may also refresh registered series
+        collected = [metric for collect in self._collectors for metric in collect()]
+        lines: List[str] = []
+        for metric in self._metrics + collected:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    "cv_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "cv_http_request_duration_seconds", "Time to send the complete response", ("method", "route")
+))
+RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "cv_http_response_size_bytes", "Response body size as sent", ("method", "route"), SIZE_BUCKETS
+))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "cv_http_requests_in_flight", "Requests currently being handled"
+))
+DATA_LOAD_SECONDS = REGISTRY.register(Histogram(
+    "cv_data_load_seconds", "Time to load and index a CV data file", ("kind",)
+))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "cv_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result")
+))
+
+RESPONSE_CACHE_HIT = CACHE_LOOKUPS.labels("response", "hit")
+RESPONSE_CACHE_MISS = CACHE_LOOKUPS.labels("response", "miss")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency, size and concurrency"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.in_flight = IN_FLIGHT.labels()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_counting(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight.dec()
+            # The route template, so /{tenant}/... is one series, not one per tenant
+            route: Optional[object] = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUESTS.labels(method, path, str(status)).inc()
+            REQUEST_SECONDS.labels(method, path).observe(elapsed)
+            RESPONSE_BYTES.labels(method, path).observe(size)
@@ -2,8 +2,8 @@
 Pydantic models for API request/response validation
 """
 
-from pydantic import BaseModel, Field, EmailStr, HttpUrl
-from typing import List, Optional, Dict, Any
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, EmailStr, HttpUrl, TypeAdapter, WithJsonSchema
+from typing import Annotated, List, Optional, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
 
@@ -20,23 +20,38 @@ class SkillCategory(str, Enum):
     web = "web"
     ai_ml = "ai_ml"
     educational = "educational"
+    technologies = "technologies"
+
+_http_url = TypeAdapter(HttpUrl)
+
+def _check_url(value: str) -> str:
+    _http_url.validate_python(value)
+    return value
+
+# An http(s) URL kept exactly as written (HttpUrl itself would normalize it,
+# e.g. adding a trailing slash)
+Url = Annotated[str, AfterValidator(_check_url), WithJsonSchema({"type": "string", "format": "uri"})]
+
+class CVModel(BaseModel):
+    """Base for models of cv-data.yml content; keys without a field are kept"""
+    model_config = ConfigDict(extra="allow")
 
 # Response Models
 class ProfileResponse(BaseModel):
     name: str
     email: EmailStr
-    phone: str
-    location: str
-    linkedin: Optional[HttpUrl]
-    github: Optional[HttpUrl]
-    portfolio: Optional[HttpUrl]
-    education_platform: Optional[HttpUrl]
-    summary: str
+    phone: Optional[str] = None
+    location: Optional[str] = None
+    linkedin: Optional[Url] = None
+    github: Optional[Url] = None
+    portfolio: Optional[Url] = None
+    education_platform: Optional[Url] = None
+    summary: Optional[str] = None
     tagline: str
     years_experience: int
     books_published: int
 
-class ExperienceItem(BaseModel):
+class ExperienceItem(CVModel):
     title: str = Field(..., description="Job title or position")
     organization: str = Field(..., description="Company or organization name")
     location: Optional[str] = Field(None, description="Work location")
@@ -49,60 +64,87 @@ class ExperienceResponse(BaseModel):
     filters: Dict[str, Any] = Field(..., description="Applied filters")
     data: List[ExperienceItem]
 
-class EducationItem(BaseModel):
+class EducationItem(CVModel):
     degree: str
-    field: Optional[str]
+    field: Optional[str] = None
     institution: str
-    year: Optional[int]
-    thesis: Optional[str]
+    year: Optional[int] = None
+    thesis: Optional[str] = None
 
-class ProjectItem(BaseModel):
+class ProjectItem(CVModel):
     name: str
-    description: Optional[str]
-    year: Optional[str]
+    description: Optional[str] = None
+    year: Optional[Union[int, str]] = None
     technologies: Optional[List[str]] = []
-    url: Optional[HttpUrl] = None
-    github: Optional[HttpUrl] = None
+    url: Optional[Url] = None
+    github: Optional[Url] = None
 
-class PublicationBook(BaseModel):
+class PublicationBook(CVModel):
     title: str
-    description: Optional[str]
-    license: Optional[str]
+    description: Optional[str] = None
+    license: Optional[str] = None
 
-class PublicationConference(BaseModel):
+class PublicationConference(CVModel):
     authors: str
     year: int
     title: str
     venue: str
-    location: Optional[str]
-    publisher: Optional[str]
-    volume: Optional[str]
-    pages: Optional[str]
+    location: Optional[str] = None
+    publisher: Optional[str] = None
+    volume: Optional[str] = None
+    pages: Optional[str] = None
 
-class PublicationsResponse(BaseModel):
+class PublicationsResponse(CVModel):
     books: List[PublicationBook] = []
     thesis: List[Dict[str, Any]] = []
     conferences: List[PublicationConference] = []
     honours: List[Dict[str, Any]] = []
 
-class SkillSet(BaseModel):
+class SkillSet(CVModel):
     core: Optional[List[str]] = []
     web: Optional[List[str]] = []
     ai_ml: Optional[List[str]] = []
     educational: Optional[List[str]] = []
 
-class CertificationItem(BaseModel):
+class Skills(CVModel):
+    programming: Optional[SkillSet] = None
+
+class CertificationItem(CVModel):
     name: str
-    year: Optional[int]
+    # A single year or a range such as "2012–2019"
+    year: Optional[Union[int, str]] = None
 
 class ContactInfo(BaseModel):
     email: EmailStr
-    phone: Optional[str]
-    linkedin: Optional[HttpUrl]
-    github: Optional[HttpUrl]
-    location: Optional[str]
-    portfolio: Optional[HttpUrl]
-    education_platform: Optional[HttpUrl]
+    phone: Optional[str] = None
+    linkedin: Optional[Url] = None
+    github: Optional[Url] = None
+    location: Optional[str] = None
+    portfolio: Optional[Url] = None
+    education_platform: Optional[Url] = None
+
+class PersonalInfo(CVModel):
+    name: str = Field(..., min_length=1)
+    email: EmailStr
+    phone: Optional[str] = None
+    linkedin: Optional[Url] = None
+    github: Optional[Url] = None
+    portfolio: Optional[Url] = None
+    education_platform: Optional[Url] = None
+    location: Optional[str] = None
+
+class CVDocument(CVModel):
+    """The whole of cv-data.yml; sections not listed here are kept as they are"""
+    personal: PersonalInfo
+    summary: Dict[str, Any] = {}
+    teaching: Dict[str, Any] = {}
+    achievements: List[str] = []
+    experience: List[ExperienceItem] = []
+    education: List[EducationItem] = []
+    publications: PublicationsResponse = PublicationsResponse()
+    projects: List[ProjectItem] = []
+    skills: Skills = Skills()
+    certifications: List[CertificationItem] = []
 
 class ContactMessage(BaseModel):
     """Model for contact form submission"""
@@ -122,6 +164,11 @@ class HealthResponse(BaseModel):
     status: str
     timestamp: datetime
     data_loaded: bool
+    data_version: Optional[str] = None
+    reloads: int = 0
+    last_reload_seconds: Optional[float] = None
+    last_reload_at: Optional[datetime] = None
+    last_reload_error: Optional[str] = None
 
 class ErrorResponse(BaseModel):
     error: str
@@ -153,11 +200,19 @@ class SkillSearch(BaseModel):
 class ExportFormat(str, Enum):
     json = "json"
     yaml = "yaml"
+    ndjson = "ndjson"
     
 # Pagination models
 class PaginationParams(BaseModel):
-    skip: int = Field(0, ge=0, description="Number of items to skip")
-    limit: int = Field(10, ge=1, le=100, description="Number of items to return")
+    cursor: Optional[str] = Field(None, max_length=200, description="Opaque cursor from a previous page's next_cursor")
+    page_size: Optional[int] = Field(None, ge=1, le=100, description="Number of items to return per page")
+
+class BatchRequest(BaseModel):
+    sections: List[str] = Field(..., min_length=1, max_length=20, description="Sections to return, e.g. profile, skills")
+
+class ProfilerSettings(BaseModel):
+    enabled: bool
+    sample_rate: Optional[float] = Field(None, gt=0, le=1, description="Fraction of requests to profile")
 
 # Response metadata
 class ResponseMetadata(BaseModel):
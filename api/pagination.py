@@ -0,0 +1,105 @@
+"""
+Opaque-cursor pagination
+
+A cursor records the data version, the offset of the next item, the page
+size and a fingerprint of the query it belongs to. Following a cursor reads
+from the same retained snapshot it was issued against, so paging through a
+collection is unaffected by a hot reload in the middle, and every page is a
+plain slice of a prebuilt list.
+"""
+
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from models import PaginationParams
+from snapshot import CVSnapshot, SnapshotHolder
+
+DEFAULT_PAGE_SIZE = 10
+
+# Hex digits of the data version kept in a cursor
+VERSION_PREFIX = 16
+
+
+@dataclass(frozen=True)
+class Page:
+    """One page of a collection and the cursor to the next"""
+    items: List[Any]
+    total: int
+    page_size: int
+    next_cursor: Optional[str]
+
+
+def is_paginated(params: PaginationParams) -> bool:
+    return params.cursor is not None or params.page_size is not None
+
+
+def fingerprint(scope: str) -> str:
+    """Short digest identifying the endpoint and filters a cursor was issued for"""
+    return hashlib.sha256(scope.encode("utf-8")).hexdigest()[:8]
+
+
+def encode_cursor(version: str, offset: int, page_size: int, scope: str) -> str:
+    payload = json.dumps(
+        [version[:VERSION_PREFIX], offset, page_size, fingerprint(scope)],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, int, str]:
+    """Return (version, offset, page_size, fingerprint), or 400 if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, offset, page_size, digest = json.loads(base64.urlsafe_b64decode(padded))
+        if not (isinstance(offset, int) and offset >= 0 and isinstance(page_size, int) and page_size > 0):
+            raise ValueError(cursor)
+        return str(version), offset, page_size, str(digest)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate(
+    holder: SnapshotHolder,
+    snapshot: CVSnapshot,
+    params: PaginationParams,
+    scope: str,
+    items: Callable[[CVSnapshot], Sequence[Any]],
+) -> Page:
+    """
+    Return the page of items(snapshot) selected by params
+
+    Without a cursor the first page of the current snapshot is returned.
+    With one, the page comes from the snapshot the cursor was issued
+    against; 410 is raised once that version is no longer retained.
+    """
+    offset = 0
+    page_size = params.page_size or DEFAULT_PAGE_SIZE
+
+    if params.cursor is not None:
+        version, offset, cursor_page_size, digest = decode_cursor(params.cursor)
+        if digest != fingerprint(scope):
+            raise HTTPException(status_code=400, detail="Cursor does not belong to this query")
+        page_size = params.page_size or cursor_page_size
+        if not snapshot.version.startswith(version):
+            snapshot = holder.snapshot_for(version)
+            if snapshot is None:
+                raise HTTPException(
+                    status_code=410,
+                    detail="Cursor refers to a data version that is no longer available; restart from the first page"
+                )
+
+    collection = items(snapshot)
+    end = offset + page_size
+    next_cursor = encode_cursor(snapshot.version, end, page_size, scope) if end < len(collection) else None
+
+    return Page(
+        items=list(collection[offset:end]),
+        total=len(collection),
+        page_size=page_size,
+        next_cursor=next_cursor,
+    )
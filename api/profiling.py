@@ -0,0 +1,164 @@
+"""
+Opt-in sampling profiler
+
+When enabled, a random `sample_rate` fraction of requests runs under
+cProfile and the results are merged into one `pstats.Stats` per route
+template. Only one request is profiled at a time: cProfile observes the
+whole event loop thread, so overlapping requests would blur together, and
+a sampled request may still include slices of other requests it awaited
+alongside. Work done in the threadpool (e.g. data reloads) is not seen.
+
+Aggregates can be downloaded as a marshalled pstats file (`python -m pstats`,
+snakeviz) or as collapsed stacks for flamegraph.pl / speedscope. cProfile
+records caller edges rather than whole stacks, so collapsed stacks are
+reconstructed by sharing each function's own time among its callers in
+proportion to the time spent through each edge.
+"""
+
+import marshal
+import os
+import random
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+if TYPE_CHECKING:  # cProfile and pstats are imported when the first request is sampled
+    import cProfile
+    import pstats
+
+Function = Tuple[str, int, str]
+
+# Call paths kept per function when reconstructing collapsed stacks
+MAX_PATHS = 32
+MAX_DEPTH = 64
+
+
+class RequestProfiler:
+    """Per-route cProfile aggregates for a sample of requests"""
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.01):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.routes: Dict[str, "pstats.Stats"] = {}
+        self.samples: Dict[str, int] = {}
+        self.enabled_at: Optional[float] = time.time() if enabled else None
+        # True while a sampled request is running
+        self.active = False
+
+    def configure(self, enabled: bool, sample_rate: Optional[float] = None) -> None:
+        if enabled and not self.enabled:
+            self.enabled_at = time.time()
+        self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.samples.clear()
+
+    def should_sample(self) -> bool:
+        return self.enabled and not self.active and random.random() < self.sample_rate
+
+    def record(self, route: str, profile: "cProfile.Profile") -> None:
+        import pstats
+
+        stats = self.routes.get(route)
+        if stats is None:
+            self.routes[route] = pstats.Stats(profile)
+        else:
+            stats.add(profile)
+        self.samples[route] = self.samples.get(route, 0) + 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "enabled_at": self.enabled_at,
+            "routes": {
+                route: {"samples": self.samples[route], "seconds": round(stats.total_tt, 6)}
+                for route, stats in self.routes.items()
+            },
+        }
+
+    def pstats_dump(self, route: str) -> bytes:
+        """The route's aggregate in the format written by pstats.Stats.dump_stats"""
+        return marshal.dumps(self.routes[route].stats)
+
+    def collapsed(self, route: str) -> str:
+        """The route's aggregate as collapsed stacks, one `a;b;c microseconds` line per path"""
+        return "".join(f"{stack} {value}\n" for stack, value in collapse(self.routes[route].stats))
+
+
+def frame_label(function: Function) -> str:
+    filename, line, name = function
+    if filename == "~":
+        # Built-ins are recorded as ('~', 0, "<built-in method ...>")
+        return name.replace(";", ":")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":")
+
+
+def collapse(stats: Dict[Function, Any]) -> List[Tuple[str, int]]:
+    """Approximate collapsed stacks from cProfile's caller edges"""
+    memo: Dict[Function, List[Tuple[Tuple[Function, ...], float]]] = {}
+
+    def paths(function: Function, visiting: frozenset, depth: int) -> List[Tuple[Tuple[Function, ...], float]]:
+        """Call paths from a root to function, each with its share of the calls"""
+        if function in memo:
+            return memo[function]
+        callers = stats[function][4] if function in stats else {}
+        callers = {caller: edge for caller, edge in callers.items() if caller not in visiting}
+        if not callers or depth >= MAX_DEPTH:
+            result = [((function,), 1.0)]
+        else:
+            # Weight each edge by the cumulative time through it, else by call count
+            weights = {caller: edge[3] for caller, edge in callers.items()}
+            total = sum(weights.values())
+            if total <= 0:
+                weights = {caller: edge[1] for caller, edge in callers.items()}
+                total = sum(weights.values()) or 1
+            result = []
+            for caller, weight in weights.items():
+                for path, share in paths(caller, visiting | {function}, depth + 1):
+                    result.append((path + (function,), share * weight / total))
+            result.sort(key=lambda item: item[1], reverse=True)
+            result = result[:MAX_PATHS]
+        if not visiting:
+            memo[function] = result
+        return result
+
+    totals: Dict[str, float] = {}
+    for function, (_, _, own_time, _, _) in stats.items():
+        if own_time <= 0:
+            continue
+        for path, share in paths(function, frozenset(), 0):
+            stack = ";".join(frame_label(frame) for frame in path)
+            totals[stack] = totals.get(stack, 0.0) + own_time * share
+    return [(stack, round(seconds * 1_000_000)) for stack, seconds in sorted(totals.items()) if seconds >= 0.5e-6]
+
+
+class ProfilerMiddleware:
+    """ASGI middleware running sampled requests under cProfile"""
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/admin/") or not self.profiler.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        import cProfile
+
+        profile = cProfile.Profile()
+        self.profiler.active = True
+        profile.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.disable()
+            self.profiler.active = False
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                self.profiler.record(route, profile)
@@ -0,0 +1,69 @@
+"""
+Sparse fieldsets
+
+A `fields=` list such as "title,organization,period" is compiled once into
+a projection function that copies only those keys out of each item, and the
+compiled function is cached so each distinct field set is only compiled
+once. Dotted names ("thesis.title") select keys of nested mappings.
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+MAX_FIELDS = 32
+
+Projection = Callable[[Any], Any]
+
+
+def parse_fields(fields: str) -> Tuple[str, ...]:
+    """Canonical field tuple for a comma-separated list; raises ValueError if empty or too long"""
+    names = tuple(sorted({name.strip() for name in fields.split(",") if name.strip()}))
+    if not names:
+        raise ValueError("fields must name at least one field")
+    if len(names) > MAX_FIELDS:
+        raise ValueError(f"fields may name at most {MAX_FIELDS} fields")
+    return names
+
+
+def _build(tree: Dict[str, Optional[dict]]) -> Projection:
+    leaves = tuple(key for key, subtree in tree.items() if subtree is None)
+    nested = tuple((key, _build(subtree)) for key, subtree in tree.items() if subtree is not None)
+
+    def project(item: Any) -> Any:
+        if isinstance(item, list):
+            return [project(element) for element in item]
+        if not isinstance(item, dict):
+            return item
+        projected = {key: item[key] for key in leaves if key in item}
+        for key, project_nested in nested:
+            if key in item:
+                projected[key] = project_nested(item[key])
+        return projected
+
+    return project
+
+
+@lru_cache(maxsize=256)
+def compile_projection(fields: Tuple[str, ...]) -> Projection:
+    """Compile a canonical field tuple into a function projecting one item"""
+    tree: Dict[str, Optional[dict]] = {}
+    for name in fields:
+        node = tree
+        *parents, leaf = name.split(".")
+        for parent in parents:
+            child = node.get(parent, {})
+            if child is None:
+                # The whole parent is already selected
+                break
+            node = node.setdefault(parent, child)
+        else:
+            node[leaf] = None
+    return _build(tree)
+
+
+def project_lists(payload: Dict[str, Any], project: Projection) -> Dict[str, Any]:
+    """Apply project to every item of every list in a response payload"""
+    return {
+        key: [project(item) for item in value] if isinstance(value, list) else value
+        for key, value in payload.items()
+    }
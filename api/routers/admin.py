@@ -0,0 +1,66 @@
+"""
+Admin endpoints
+
+Only mounted when ADMIN_API_KEY is set; every request must carry the key
+in the `X-API-Key` header.
+"""
+
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from models import ProfilerSettings
+from profiling import RequestProfiler
+
+
+def create_admin_router(api_key: str, profiler: RequestProfiler) -> APIRouter:
+    """Build the admin routes, guarded by api_key"""
+
+    def require_key(x_api_key: str = Header("", description="Admin API key")) -> None:
+        if not secrets.compare_digest(x_api_key.encode(), api_key.encode()):
+            raise HTTPException(status_code=401, detail="Invalid API key")
+
+    router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_key)])
+
+    def require_profile(route: str) -> None:
+        if route not in profiler.routes:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No profile for route '{route}'. Profiled: {sorted(profiler.routes)}"
+            )
+
+    @router.get("/profiler")
+    async def get_profiler():
+        """Profiler settings and the routes profiled so far"""
+        return profiler.status()
+
+    @router.put("/profiler")
+    async def set_profiler(settings: ProfilerSettings):
+        """Turn the profiler on or off and set its sample rate"""
+        profiler.configure(settings.enabled, settings.sample_rate)
+        return profiler.status()
+
+    @router.delete("/profiler")
+    async def reset_profiler():
+        """Discard the profiles collected so far"""
+        profiler.reset()
+        return profiler.status()
+
+    @router.get("/profiler/pstats")
+    async def download_pstats(route: str = Query(..., description="Route template, e.g. /experience")):
+        """Aggregate profile of a route as a pstats file"""
+        require_profile(route)
+        return Response(
+            content=profiler.pstats_dump(route),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="profile.pstats"'}
+        )
+
+    @router.get("/profiler/collapsed")
+    async def download_collapsed(route: str = Query(..., description="Route template, e.g. /experience")):
+        """Aggregate profile of a route as collapsed stacks for flame graphs"""
+        require_profile(route)
+        return PlainTextResponse(profiler.collapsed(route))
+
+    return router
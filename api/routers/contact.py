@@ -0,0 +1,33 @@
+"""
+Contact form endpoint
+"""
+
+from fastapi import APIRouter, HTTPException
+
+from contact import ContactInbox, InboxFull
+from models import ContactMessage, ContactResponse
+
+
+def create_contact_router(inbox: ContactInbox) -> APIRouter:
+    """Build the contact form route, queueing messages on inbox"""
+    router = APIRouter()
+
+    @router.post("/contact", tags=["Contact"], status_code=202, response_model=ContactResponse)
+    async def submit_contact(message: ContactMessage):
+        """
+        Send a message through the contact form
+
+        The message is accepted once it is queued; it is saved shortly after.
+        Answers 503 with Retry-After when too many messages are waiting.
+        """
+        try:
+            message_id, received_at = inbox.submit(message)
+        except InboxFull:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many messages are waiting to be saved; please try again shortly",
+                headers={"Retry-After": "5"}
+            )
+        return ContactResponse(success=True, message="Message received", id=message_id, timestamp=received_at)
+
+    return router
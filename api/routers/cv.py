@@ -0,0 +1,470 @@
+"""
+CV data endpoints
+
+The same set of routes is served for the default CV at `/` and for every
+tenant at `/{tenant}/`. `create_router` builds the routes around a
+dependency that resolves which snapshot a request reads from.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+import sections
+from cache import encode_json, encode_yaml, join_json_object
+from changes import diff
+from conditional import check_not_modified
+from models import BatchRequest, ExperienceFilter, PaginationParams, SkillCategory, SkillSearch
+from pagination import is_paginated, paginate
+from projection import Projection, compile_projection, parse_fields, project_lists
+from search import SEARCH_SECTIONS
+from semantic import SEMANTIC_SECTIONS
+from snapshot import CVSnapshot, SnapshotHolder
+
+# Filters of a plain /experience request, which is served from the cache
+UNFILTERED = ExperienceFilter()
+
+
+def cached_section(snapshot: CVSnapshot, name: str, request: Request) -> Response:
+    """Serve a section from the response cache, encoding it once per data version"""
+    cached = snapshot.responses.get(name, lambda: sections.payload(name, snapshot.data))
+    return cached.to_response(request.headers.get("accept-encoding"))
+
+
+def batch_names(requested: List[str]) -> Tuple[str, ...]:
+    """Canonical section tuple for a batch, in `/` order; 400 on unknown names"""
+    wanted = {name.strip() for name in requested if name.strip()}
+    unknown = wanted - sections.SECTIONS.keys()
+    if not wanted or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sections {sorted(unknown)}. Supported: {', '.join(sections.SECTIONS)}"
+        )
+    return tuple(name for name in sections.SECTIONS if name in wanted)
+
+
+async def cached_batch(snapshot: CVSnapshot, names: Tuple[str, ...], request: Request) -> Response:
+    """
+    Serve several sections as one JSON object
+
+    The batch is spliced together from each section's cached encoding, and
+    the result is itself cached per section set for the data version (up to
+    the cache's entry limit). A new section set is assembled and compressed
+    in the threadpool, as brotli takes tens of milliseconds.
+    """
+    def assemble() -> bytes:
+        bodies = (
+            (name, snapshot.responses.get(name, lambda: sections.payload(name, snapshot.data)).body)
+            for name in names
+        )
+        return join_json_object([
+            ("version", encode_json(snapshot.version)),
+            ("sections", join_json_object(bodies)),
+        ])
+
+    key = ("batch", names)
+    if key in snapshot.responses:
+        cached = snapshot.responses.get(key, assemble, encode=bytes)
+    else:
+        cached = await run_in_threadpool(snapshot.responses.get, key, assemble, bytes)
+    return cached.to_response(request.headers.get("accept-encoding"))
+
+
+def get_projection(
+    fields: Optional[str] = Query(
+        None,
+        max_length=500,
+        description="Comma-separated fields to keep in each item, e.g. title,organization,period"
+    )
+) -> Optional[Projection]:
+    """Compiled (and cached) projection for the fields parameter, if given"""
+    if fields is None:
+        return None
+    try:
+        return compile_projection(parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def list_section(
+    snapshot: CVSnapshot,
+    name: str,
+    request: Request,
+    project: Optional[Projection]
+) -> Any:
+    """A list section, from the cache unless a sparse fieldset trims its items"""
+    if project is None:
+        return cached_section(snapshot, name, request)
+    return project_lists(sections.SECTIONS[name](snapshot.data), project)
+
+
+def paginated_collection(
+    holder: SnapshotHolder,
+    snapshot: CVSnapshot,
+    pagination: PaginationParams,
+    name: str,
+    project: Optional[Projection]
+) -> Dict[str, Any]:
+    """One page of a prebuilt collection"""
+    page = paginate(holder, snapshot, pagination, name, lambda snapshot: snapshot.collections[name])
+    return {
+        "total": page.total,
+        "page_size": page.page_size,
+        "next_cursor": page.next_cursor,
+        name: [project(item) for item in page.items] if project else page.items
+    }
+
+
+def create_router(get_holder: Callable[..., SnapshotHolder]) -> APIRouter:
+    """Build the CV data routes, reading data from the holder get_holder resolves"""
+
+    def get_snapshot(holder: SnapshotHolder = Depends(get_holder)) -> CVSnapshot:
+        snapshot = holder.current
+        if snapshot is None:
+            raise HTTPException(status_code=503, detail="CV data not loaded")
+        return snapshot
+
+    def not_modified(request: Request, snapshot: CVSnapshot = Depends(get_snapshot)) -> None:
+        """Answer 304 before the handler runs when the client's copy is current"""
+        check_not_modified(request, snapshot.version, snapshot.mtime)
+
+    router = APIRouter(dependencies=[Depends(not_modified)])
+    current_holder = Depends(get_holder)
+    current_snapshot = Depends(get_snapshot)
+
+    @router.get("/profile", tags=["Profile"])
+    async def get_profile(request: Request, snapshot: CVSnapshot = current_snapshot):
+        """Get basic profile information"""
+        return cached_section(snapshot, "profile", request)
+
+    @router.get("/experience", tags=["Experience"])
+    async def get_experience(
+        request: Request,
+        filters: ExperienceFilter = Depends(),
+        pagination: PaginationParams = Depends(),
+        project: Optional[Projection] = Depends(get_projection),
+        holder: SnapshotHolder = current_holder,
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Get work experience
+
+        - **type**: Filter by experience type (academic, consulting, military, industry)
+        - **organization**: Filter by organization name: case-insensitive, matching the start of any word ("curtin", "univ")
+        - **year_start**: Only entries whose period overlaps this year or later
+        - **year_end**: Only entries whose period overlaps this year or earlier
+        - **limit**: Limit number of results
+        - **page_size** / **cursor**: Page through the results
+        - **fields**: Only include these fields of each entry
+        """
+        def matching(snapshot: CVSnapshot) -> List[Dict[str, Any]]:
+            if filters == UNFILTERED:
+                return snapshot.collections["experience"]
+            experience = snapshot.experience.filter(
+                type=filters.type,
+                organization=filters.organization,
+                year_start=filters.year_start,
+                year_end=filters.year_end,
+            )
+            # Limit results if specified
+            return experience[:filters.limit] if filters.limit else experience
+
+        if is_paginated(pagination):
+            scope = f"experience:{filters.model_dump_json()}"
+            page = paginate(holder, snapshot, pagination, scope, matching)
+            return {
+                "total": page.total,
+                "filters": filters.model_dump(mode="json"),
+                "page_size": page.page_size,
+                "next_cursor": page.next_cursor,
+                "data": [project(entry) for entry in page.items] if project else page.items
+            }
+
+        if filters == UNFILTERED:
+            return list_section(snapshot, "experience", request, project)
+
+        experience = matching(snapshot)
+        return {
+            "total": len(experience),
+            "filters": filters.model_dump(mode="json"),
+            "data": [project(entry) for entry in experience] if project else experience
+        }
+
+    @router.get("/skills", tags=["Skills"])
+    async def get_skills(
+        request: Request,
+        category: Optional[str] = None,
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Get technical skills
+
+        - **category**: Filter by category (programming, certifications, etc.)
+        """
+        skills = snapshot.data.get('skills', {})
+
+        if category:
+            if category in skills:
+                return {
+                    "category": category,
+                    "data": skills[category]
+                }
+            else:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Category '{category}' not found. Available: {list(skills.keys())}"
+                )
+
+        return cached_section(snapshot, "skills", request)
+
+    @router.get("/skills/suggest", tags=["Skills"])
+    async def suggest_skills(
+        q: str = Query(..., min_length=1, max_length=50),
+        category: Optional[SkillCategory] = None,
+        limit: int = Query(10, ge=1, le=50),
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Autocomplete skill names
+
+        - **q**: Start of a skill, certification or technology name (or of any word in it)
+        - **category**: Only suggest names in this category
+        - **limit**: Maximum number of suggestions
+
+        Exact matches come first, then names starting with `q`, then names
+        with a later word starting with `q`; ties go to names that appear more often.
+        """
+        search = SkillSearch(query=q, category=category)
+        return snapshot.skill_index.suggest(
+            search.query, limit=limit, category=search.category.value if search.category else None
+        )
+
+    @router.get("/education", tags=["Education"])
+    async def get_education(
+        request: Request,
+        project: Optional[Projection] = Depends(get_projection),
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Get educational background
+
+        - **fields**: Only include these fields of each entry
+        """
+        return list_section(snapshot, "education", request, project)
+
+    @router.get("/projects", tags=["Projects"])
+    async def get_projects(
+        request: Request,
+        pagination: PaginationParams = Depends(),
+        project: Optional[Projection] = Depends(get_projection),
+        holder: SnapshotHolder = current_holder,
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Get list of projects
+
+        - **page_size** / **cursor**: Page through the results
+        - **fields**: Only include these fields of each item
+        """
+        if is_paginated(pagination):
+            return paginated_collection(holder, snapshot, pagination, "projects", project)
+        return list_section(snapshot, "projects", request, project)
+
+    @router.get("/publications", tags=["Publications"])
+    async def get_publications(
+        request: Request,
+        pagination: PaginationParams = Depends(),
+        project: Optional[Projection] = Depends(get_projection),
+        holder: SnapshotHolder = current_holder,
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Get publications including books and papers
+
+        - **page_size** / **cursor**: Page through the results
+        - **fields**: Only include these fields of each item
+
+        Paginated pages list books, theses, conferences and honours together,
+        each item tagged with its `category`.
+        """
+        if is_paginated(pagination):
+            return paginated_collection(holder, snapshot, pagination, "publications", project)
+        return list_section(snapshot, "publications", request, project)
+
+    @router.get("/achievements", tags=["Achievements"])
+    async def get_achievements(
+        request: Request,
+        pagination: PaginationParams = Depends(),
+        project: Optional[Projection] = Depends(get_projection),
+        holder: SnapshotHolder = current_holder,
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Get key achievements
+
+        - **page_size** / **cursor**: Page through the results
+        - **fields**: Only include these fields of each item
+        """
+        if is_paginated(pagination):
+            return paginated_collection(holder, snapshot, pagination, "achievements", project)
+        return list_section(snapshot, "achievements", request, project)
+
+    @router.get("/contact", tags=["Contact"])
+    async def get_contact(request: Request, snapshot: CVSnapshot = current_snapshot):
+        """Get contact information"""
+        return cached_section(snapshot, "contact", request)
+
+    @router.get("/batch", tags=["Batch"])
+    async def get_batch(
+        request: Request,
+        names: str = Query(
+            ...,
+            alias="sections",
+            max_length=200,
+            description="Comma-separated sections, e.g. profile,skills,experience"
+        ),
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Get several sections in one response
+
+        - **sections**: Sections to include (profile, experience, skills, ...)
+
+        All sections are read from the same data version, reported as `version`.
+        """
+        return await cached_batch(snapshot, batch_names(names.split(",")), request)
+
+    @router.post("/batch", tags=["Batch"])
+    async def post_batch(
+        request: Request,
+        batch: BatchRequest,
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """Get several sections in one response, listed in the request body"""
+        return await cached_batch(snapshot, batch_names(batch.sections), request)
+
+    @router.get("/search", tags=["Search"])
+    async def search_cv(
+        q: str = Query(..., min_length=1, max_length=200),
+        section: Optional[str] = None,
+        limit: int = Query(10, ge=1, le=50),
+        fuzzy: bool = False,
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Full-text search across the CV
+
+        - **q**: Search terms
+        - **section**: Restrict hits to one section (experience, projects, publications, ...)
+        - **limit**: Maximum number of hits to return
+        - **fuzzy**: Also match misspelled or partial terms ("pyhton", "tensorflw", "uni")
+        """
+        if section is not None and section not in SEARCH_SECTIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid section '{section}'. Supported: {', '.join(SEARCH_SECTIONS)}"
+            )
+
+        return snapshot.search_index.search(q, limit=limit, section=section, fuzzy=fuzzy)
+
+    @router.get("/search/semantic", tags=["Search"])
+    async def search_semantic(
+        q: str = Query(..., min_length=1, max_length=200),
+        section: Optional[str] = None,
+        limit: int = Query(10, ge=1, le=50),
+        lsa: bool = True,
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Search by meaning rather than exact words
+
+        - **q**: What to look for, e.g. "machine learning"
+        - **section**: Restrict hits to one section (experience, projects, publications, education)
+        - **limit**: Maximum number of hits to return
+        - **lsa**: Compare in the latent semantic space (false, or a CV too small for one: plain TF-IDF cosine)
+
+        Searches every experience responsibility, project, publication and
+        thesis, ranked by cosine similarity.
+        """
+        if section is not None and section not in SEMANTIC_SECTIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid section '{section}'. Supported: {', '.join(SEMANTIC_SECTIONS)}"
+            )
+        lazy_index = snapshot.semantic_index
+        # The first query of a data version builds the index off the event loop
+        index = lazy_index.get() if lazy_index.built else await run_in_threadpool(lazy_index.get)
+        if index is None:
+            raise HTTPException(status_code=503, detail="Semantic search needs NumPy, which is not installed")
+
+        return index.search(q, limit=limit, section=section, lsa=lsa)
+
+    @router.get("/changes", tags=["Changes"])
+    async def get_changes(
+        request: Request,
+        since: str = Query(
+            ...,
+            min_length=8,
+            max_length=64,
+            pattern="^[0-9a-f]+$",
+            description="Data version the client has (or a prefix of at least 8 characters)"
+        ),
+        holder: SnapshotHolder = current_holder,
+        snapshot: CVSnapshot = current_snapshot
+    ):
+        """
+        Changes to the CV data since an earlier version
+
+        Returns the current `version` and an RFC 6902 JSON Patch that turns
+        the `/export` data of version `since` into the current data. Only
+        recent versions are kept; an older `since` gets 410, after which
+        the client should fetch `/export` again.
+        """
+        previous = holder.snapshot_for(since)
+        if previous is None:
+            raise HTTPException(
+                status_code=410,
+                detail=f"Version '{since}' is no longer retained; fetch /export for the full data"
+            )
+
+        # Computed once per pair of versions, cached with the newer one
+        cached = snapshot.responses.get(("changes", previous.version), lambda: {
+            "since": previous.version,
+            "version": snapshot.version,
+            "patch": diff(previous.data, snapshot.data),
+        })
+        return cached.to_response(request.headers.get("accept-encoding"))
+
+    @router.get("/export", tags=["Export"])
+    async def export_cv(request: Request, format: str = "json", snapshot: CVSnapshot = current_snapshot):
+        """
+        Export complete CV data
+
+        - **format**: Export format (json, yaml or ndjson)
+
+        `ndjson` streams one JSON record per line (one per experience entry,
+        project, publication, ...) so clients can process the CV incrementally.
+        """
+        if format.lower() == "json":
+            return cached_section(snapshot, "export", request)
+        elif format.lower() == "ndjson":
+            async def stream_records():
+                for record in sections.records(snapshot.data):
+                    yield encode_json(record) + b"\n"
+
+            return StreamingResponse(stream_records(), media_type="application/x-ndjson")
+        elif format.lower() == "yaml":
+            # YAML is rendered once per data version, like the JSON export
+            cached = snapshot.responses.get(
+                sections.YAML_EXPORT, lambda: snapshot.data, encode_yaml, sections.YAML_MEDIA_TYPE
+            )
+            return cached.to_response(request.headers.get("accept-encoding"))
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid format '{format}'. Supported: json, yaml, ndjson"
+            )
+
+    return router
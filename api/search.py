@@ -0,0 +1,282 @@
+"""
+Full-text search over the CV
+
+An inverted index is built once per data version from every string in the
+searchable sections. Each posting carries a precomputed BM25 weight and the
+character offsets of the term in its field, and posting lists are ordered by
+weight so a query only ever scans a bounded prefix of each list.
+
+Fuzzy queries first map each query term onto the index's vocabulary. A
+character-trigram index over the vocabulary yields candidates sharing
+enough trigrams with the term to be within its edit budget; only those
+(plus vocabulary terms the query term is a prefix of) have their edit
+distance computed. Each expansion's postings are then scored like an exact
+term, scaled by how similar it is to what was typed.
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Sections indexed for search, in the order hits are reported on ties
+SEARCH_SECTIONS = (
+    "experience",
+    "projects",
+    "publications",
+    "skills",
+    "certifications",
+    "achievements",
+    "teaching",
+)
+
+# Postings scanned per query term; keeps latency flat as the CV grows
+MAX_POSTINGS_SCANNED = 512
+
+# (weight, field_id, offsets) of one field containing a term
+Posting = Tuple[float, int, Tuple[Tuple[int, int], ...]]
+
+# Vocabulary terms a fuzzy query term may expand to
+MAX_EXPANSIONS = 8
+
+# Query terms shorter than this are only completed as prefixes, not corrected
+MIN_FUZZY_LENGTH = 4
+
+# Similarity credited to a vocabulary term the query term is a prefix of
+PREFIX_SIMILARITY = 0.8
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the to with".split()
+)
+
+_token_re = re.compile(r"\w+(?:[+#]+|\b)")
+
+
+def tokenize(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield (term, start, end) for every indexable word in text"""
+    for match in _token_re.finditer(text.lower()):
+        term = match.group()
+        if term not in STOPWORDS:
+            yield term, match.start(), match.end()
+
+
+def escape_pointer(token: Any) -> str:
+    """Escape one JSON Pointer reference token (RFC 6901)"""
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def iter_strings(value: Any, path: str) -> Iterator[Tuple[str, str]]:
+    """Yield (json_pointer, text) for every string or number leaf under value"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from iter_strings(item, f"{path}/{escape_pointer(key)}")
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from iter_strings(item, f"{path}/{index}")
+    elif isinstance(value, str):
+        yield path, value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield path, str(value)
+
+
+def trigrams(term: str) -> List[str]:
+    """Character trigrams of term, padded so its first letters count too"""
+    padded = f"  {term} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def max_edits(term: str) -> int:
+    """Typos tolerated in a query term of this length"""
+    if len(term) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(term) < 6 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance between a and b, capped at limit + 1
+
+    Insertions, deletions, substitutions and adjacent transpositions
+    ("pyhton") each cost one edit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+@dataclass(frozen=True)
+class Field:
+    """One indexed string and where it lives in the CV"""
+    section: str
+    path: str
+    text: str
+
+
+class SearchIndex:
+    """Inverted index from terms to weighted, offset-annotated postings"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.fields: List[Field] = []
+        occurrences: Dict[str, Dict[int, List[Tuple[int, int]]]] = defaultdict(dict)
+        lengths: List[int] = []
+
+        for section in SEARCH_SECTIONS:
+            if section not in data:
+                continue
+            for path, text in iter_strings(data[section], f"/{section}"):
+                field_id = len(self.fields)
+                self.fields.append(Field(section, path, text))
+                length = 0
+                for term, start, end in tokenize(text):
+                    occurrences[term].setdefault(field_id, []).append((start, end))
+                    length += 1
+                lengths.append(length)
+
+        count = len(self.fields)
+        average = (sum(lengths) / count) if count else 0.0
+
+        # term -> ((weight, field_id, offsets), ...) in descending weight order
+        self.postings: Dict[str, Tuple[Posting, ...]] = {}
+        for term, fields in occurrences.items():
+            idf = math.log(1 + (count - len(fields) + 0.5) / (len(fields) + 0.5))
+            postings = []
+            for field_id, offsets in fields.items():
+                tf = len(offsets)
+                norm = 1 - B + B * lengths[field_id] / average if average else 1.0
+                weight = idf * tf * (K1 + 1) / (tf + K1 * norm)
+                postings.append((weight, field_id, tuple(offsets)))
+            postings.sort(key=lambda posting: (-posting[0], posting[1]))
+            self.postings[term] = tuple(postings)
+
+        # section -> term -> the term's postings in that section, so a
+        # section-filtered query scans only postings it can use
+        section_postings: Dict[str, Dict[str, List[Posting]]] = defaultdict(lambda: defaultdict(list))
+        for term, postings in self.postings.items():
+            for posting in postings:
+                section_postings[self.fields[posting[1]].section][term].append(posting)
+        self.section_postings: Dict[str, Dict[str, Tuple[Posting, ...]]] = {
+            section: {term: tuple(postings) for term, postings in terms.items()}
+            for section, terms in section_postings.items()
+        }
+
+        # Sorted vocabulary, and trigram -> ids of the vocabulary terms containing it
+        self.vocabulary: List[str] = sorted(self.postings)
+        trigram_terms: Dict[str, List[int]] = defaultdict(list)
+        for term_id, term in enumerate(self.vocabulary):
+            for trigram in set(trigrams(term)):
+                trigram_terms[trigram].append(term_id)
+        self.trigrams: Dict[str, Tuple[int, ...]] = {
+            trigram: tuple(term_ids) for trigram, term_ids in trigram_terms.items()
+        }
+
+    def expand(self, term: str) -> Dict[str, float]:
+        """Vocabulary terms close to term, each with its similarity in (0, 1]"""
+        similar: Dict[str, float] = {}
+        if term in self.postings:
+            similar[term] = 1.0
+
+        if len(term) >= MIN_FUZZY_LENGTH - 1:
+            index = bisect_left(self.vocabulary, term)
+            while index < len(self.vocabulary) and self.vocabulary[index].startswith(term):
+                similar.setdefault(self.vocabulary[index], PREFIX_SIMILARITY)
+                index += 1
+
+        # Only terms missing from the vocabulary are treated as misspelt
+        limit = max_edits(term) if term not in self.postings else 0
+        if limit:
+            # One edit changes at most four trigrams (a transposition), so a
+            # term within the budget shares at least this many with the query
+            grams = set(trigrams(term))
+            required = max(1, len(grams) - 4 * limit)
+            shared: Dict[int, int] = defaultdict(int)
+            for trigram in grams:
+                for term_id in self.trigrams.get(trigram, ()):
+                    shared[term_id] += 1
+            for term_id, count in shared.items():
+                candidate = self.vocabulary[term_id]
+                if count < required or candidate in similar:
+                    continue
+                distance = edit_distance(term, candidate, limit)
+                if distance <= limit:
+                    similar[candidate] = 1 - distance / max(len(term), len(candidate))
+
+        best = heapq.nsmallest(MAX_EXPANSIONS, similar, key=lambda candidate: (-similar[candidate], candidate))
+        return {candidate: similar[candidate] for candidate in best}
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        section: Optional[str] = None,
+        fuzzy: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Return the best matching fields for query with their match offsets
+
+        With fuzzy set, each query term also matches misspellings and
+        completions of it, and a field scores by its best match per term.
+        """
+        terms = list(dict.fromkeys(term for term, _, _ in tokenize(query)))
+        expansions = {term: self.expand(term) if fuzzy else {term: 1.0} for term in terms}
+
+        postings = self.postings if section is None else self.section_postings.get(section, {})
+        scores: Dict[int, float] = defaultdict(float)
+        matches: Dict[int, List[Tuple[str, Tuple[Tuple[int, int], ...]]]] = defaultdict(list)
+        for term in terms:
+            term_scores: Dict[int, float] = {}
+            for match, similarity in expansions[term].items():
+                for weight, field_id, offsets in islice(postings.get(match, ()), MAX_POSTINGS_SCANNED):
+                    term_scores[field_id] = max(term_scores.get(field_id, 0.0), weight * similarity)
+                    matches[field_id].append((match, offsets))
+            for field_id, score in term_scores.items():
+                scores[field_id] += score
+
+        best = heapq.nsmallest(limit, scores, key=lambda field_id: (-scores[field_id], field_id))
+
+        hits = []
+        for field_id in best:
+            field = self.fields[field_id]
+            hits.append({
+                "section": field.section,
+                "path": field.path,
+                "text": field.text,
+                "score": round(scores[field_id], 4),
+                "matches": sorted(
+                    (
+                        {"term": term, "start": start, "end": end}
+                        for term, offsets in matches[field_id]
+                        for start, end in offsets
+                    ),
+                    key=lambda match: match["start"],
+                ),
+            })
+
+        result = {
+            "query": query,
+            "terms": terms,
+            "total": len(scores),
+            "hits": hits,
+        }
+        if fuzzy:
+            result["expansions"] = {term: list(expansions[term]) for term in terms}
+        return result
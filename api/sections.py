@@ -0,0 +1,189 @@
+"""
+Payload builders for the unparameterized CV sections
+
+Each builder turns the loaded CV data into the JSON-ready body of one
+endpoint. They are pure functions of the data so their output can be
+serialized once per data version and reused.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Type
+
+from pydantic import BaseModel
+
+from models import ContactInfo, ExperienceResponse, ProfileResponse, PublicationsResponse
+
+
+def profile(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Basic profile information"""
+    personal = cv_data.get('personal', {})
+    summary = cv_data.get('summary', {})
+
+    return {
+        "name": personal.get('name'),
+        "email": personal.get('email'),
+        "phone": personal.get('phone'),
+        "location": personal.get('location'),
+        "linkedin": personal.get('linkedin'),
+        "github": personal.get('github'),
+        "portfolio": personal.get('portfolio'),
+        "education_platform": personal.get('education_platform'),
+        "summary": summary.get('main'),
+        "tagline": "Make Contact Count",
+        "years_experience": 25,
+        "books_published": 4
+    }
+
+
+def experience(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """All work experience, unfiltered"""
+    experience = cv_data.get('experience', [])
+    return {
+        "total": len(experience),
+        "filters": {
+            "type": None,
+            "organization": None,
+            "year_start": None,
+            "year_end": None,
+            "limit": None
+        },
+        "data": experience
+    }
+
+
+def skills(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """All technical skills, grouped by category"""
+    return cv_data.get('skills', {})
+
+
+def education(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Educational background"""
+    return {
+        "education": cv_data.get('education', [])
+    }
+
+
+def projects(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Notable projects"""
+    return {
+        "projects": cv_data.get('projects', [])
+    }
+
+
+def publications(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Books, theses and papers"""
+    publications = cv_data.get('publications', {})
+    return {
+        "books": publications.get('books', []),
+        "thesis": publications.get('thesis', []),
+        "conferences": publications.get('conferences', []),
+        "honours": publications.get('honours', [])
+    }
+
+
+def achievements(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Key achievements"""
+    return {
+        "achievements": cv_data.get('achievements', [])
+    }
+
+
+def contact(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Contact information"""
+    personal = cv_data.get('personal', {})
+
+    return {
+        "email": personal.get('email'),
+        "phone": personal.get('phone'),
+        "linkedin": personal.get('linkedin'),
+        "github": personal.get('github'),
+        "location": personal.get('location'),
+        "portfolio": personal.get('portfolio'),
+        "education_platform": personal.get('education_platform')
+    }
+
+
+def export(cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The complete CV data"""
+    return cv_data
+
+
+def publication_items(cv_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """All publications as one list, each tagged with its category"""
+    publications = cv_data.get('publications', {})
+    return [
+        {"category": category, **item}
+        for category in ("books", "thesis", "conferences", "honours")
+        for item in publications.get(category, [])
+    ]
+
+
+def records(cv_data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    The complete CV as a stream of small records
+
+    Every item of a list section is its own record. Mapping sections are
+    split one level down, so e.g. each publication becomes a record tagged
+    with its category, while scalar values are emitted whole.
+    """
+    for section, value in cv_data.items():
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                yield {"section": section, "index": index, "data": item}
+        elif isinstance(value, dict):
+            for category, item in value.items():
+                if isinstance(item, list):
+                    for index, element in enumerate(item):
+                        yield {"section": section, "category": category, "index": index, "data": element}
+                else:
+                    yield {"section": section, "category": category, "data": item}
+        else:
+            yield {"section": section, "data": value}
+
+
+# Section name -> payload builder, in the order they are listed at `/`
+SECTIONS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "profile": profile,
+    "experience": experience,
+    "skills": skills,
+    "education": education,
+    "projects": projects,
+    "publications": publications,
+    "achievements": achievements,
+    "contact": contact,
+    "export": export,
+}
+
+# Sections whose payload is checked against a response model
+RESPONSE_MODELS: Dict[str, Type[BaseModel]] = {
+    "profile": ProfileResponse,
+    "experience": ExperienceResponse,
+    "publications": PublicationsResponse,
+    "contact": ContactInfo,
+}
+
+
+def payload(name: str, cv_data: Dict[str, Any]) -> Any:
+    """
+    The payload of a section, dumped through its response model if it has one
+
+    Meant to run once per data version, when the response is cached; a
+    payload that does not fit its model raises ValueError.
+    """
+    content = SECTIONS[name](cv_data)
+    model = RESPONSE_MODELS.get(name)
+    if model is None:
+        return content
+    return model.model_validate(content).model_dump(mode="json", exclude_unset=True)
+
+
+# Cache key and media type of the YAML rendering of the export
+YAML_EXPORT = ("export", "yaml")
+YAML_MEDIA_TYPE = "text/yaml"
+
+# Paginated collection name -> builder of its item list
+COLLECTIONS: Dict[str, Callable[[Dict[str, Any]], List[Any]]] = {
+    "experience": lambda cv_data: cv_data.get('experience', []),
+    "projects": lambda cv_data: cv_data.get('projects', []),
+    "publications": publication_items,
+    "achievements": lambda cv_data: cv_data.get('achievements', []),
+}
@@ -0,0 +1,214 @@
+"""
+Semantic search over the CV's prose
+
+Every experience responsibility, project, publication and thesis becomes a
+document. On the first semantic query of a data version (not at load time,
+which is kept quick for cold starts) the documents are turned into a TF-IDF
+matrix and, for latent semantic analysis (LSA), a truncated SVD of it:
+documents and queries are compared in a few dozen latent dimensions, where
+terms that appear in the same contexts ("machine learning", "CNN models")
+land close together even when a document shares no word with the query.
+Answering a query is one matrix-vector product and a partial sort, all done
+locally.
+
+A CV too small to support at least `MIN_DIMENSIONS` latent dimensions is
+searched by plain TF-IDF cosine instead, even when LSA is asked for: with a
+single dimension every document on the query's side of it would score 1.0.
+Responses report which was used in `lsa`.
+
+NumPy is optional and only imported when an index is first built; without
+it no index is built and the endpoint answers 503.
+"""
+
+import math
+import threading
+from collections import Counter
+from functools import lru_cache
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from search import iter_strings, tokenize
+
+# Sections holding documents, in the order they are indexed
+SEMANTIC_SECTIONS = ("experience", "projects", "publications", "education")
+
+# Latent dimensions kept by LSA: one per this many texts, up to the maximum.
+# Too many dimensions and LSA degenerates into plain TF-IDF matching.
+TEXTS_PER_DIMENSION = 8
+MAX_DIMENSIONS = 100
+
+# Fewer latent dimensions than this rank nothing; TF-IDF cosine is used instead
+MIN_DIMENSIONS = 2
+
+# Education entries are documents only when they have a thesis
+THESIS_KEY = "thesis"
+
+
+@lru_cache(maxsize=None)
+def numpy_module() -> Optional[ModuleType]:
+    """NumPy, imported on first use; None when it is not installed"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def iter_contexts(data: Dict[str, Any]) -> Iterator[str]:
+    """
+    Texts that only inform the latent space, not returned as hits
+
+    A responsibility is short and shares few words with anything, but its
+    experience entry as a whole ties it to its neighbours ("CNN models" and
+    "machine learning" under one role).
+    """
+    for entry in data.get("experience") or []:
+        yield " ".join(text for _, text in iter_strings(entry, ""))
+
+
+def iter_documents(data: Dict[str, Any]) -> Iterator[Tuple[str, str, str]]:
+    """Yield (section, json_pointer, text) for every document in the CV"""
+    for index, entry in enumerate(data.get("experience") or []):
+        for key in ("responsibilities", "projects"):
+            for position, text in enumerate(entry.get(key) or []):
+                yield "experience", f"/experience/{index}/{key}/{position}", text
+    for index, project in enumerate(data.get("projects") or []):
+        yield "projects", f"/projects/{index}", " ".join(text for _, text in iter_strings(project, ""))
+    for category, items in (data.get("publications") or {}).items():
+        for index, item in enumerate(items or []):
+            text = " ".join(text for _, text in iter_strings(item, ""))
+            yield "publications", f"/publications/{category}/{index}", text
+    for index, entry in enumerate(data.get("education") or []):
+        if entry.get(THESIS_KEY):
+            yield "education", f"/education/{index}", " ".join(text for _, text in iter_strings(entry, ""))
+
+
+class SemanticIndex:
+    """TF-IDF document matrix with an LSA projection, built once per data version"""
+
+    def __init__(self, data: Dict[str, Any], max_dimensions: int = MAX_DIMENSIONS):
+        np = numpy_module()
+        self.documents: List[Tuple[str, str, str]] = list(iter_documents(data))
+        total = len(self.documents)
+        texts = [text for _, _, text in self.documents] + list(iter_contexts(data))
+        counts = [Counter(term for term, _, _ in tokenize(text)) for text in texts]
+
+        document_frequency: Counter = Counter()
+        for terms in counts[:total]:
+            document_frequency.update(terms.keys())
+        self.terms: Dict[str, int] = {term: column for column, term in enumerate(sorted(document_frequency))}
+        self.idf = np.array(
+            [math.log((1 + total) / (1 + document_frequency[term])) + 1 for term in self.terms],
+            dtype=np.float32,
+        )
+
+        # Sublinear term frequency, scaled by idf, each row of unit length
+        weights = np.zeros((len(texts), len(self.terms)), dtype=np.float32)
+        for row, terms in enumerate(counts):
+            for term, count in terms.items():
+                column = self.terms.get(term)
+                if column is not None:
+                    weights[row, column] = 1 + math.log(count)
+        weights = normalize_rows(weights * self.idf)
+        self.matrix = weights[:total]
+        self.sections = np.array([section for section, _, _ in self.documents])
+
+        # The rank-k SVD of documents and contexts together defines the latent
+        # space; documents are folded into it like queries are
+        dimensions = min(max_dimensions, len(texts) // TEXTS_PER_DIMENSION, len(self.terms))
+        if total and dimensions >= MIN_DIMENSIONS:
+            _, _, vt = np.linalg.svd(weights, full_matrices=False)
+            self.components = vt[:dimensions]
+        else:
+            self.components = np.zeros((0, len(self.terms)), dtype=np.float32)
+        self.latent = normalize_rows(self.matrix @ self.components.T)
+
+    @property
+    def has_latent_space(self) -> bool:
+        return self.dimensions >= MIN_DIMENSIONS
+
+    @property
+    def dimensions(self) -> int:
+        return self.components.shape[0]
+
+    def vectorize(self, query: str) -> Any:
+        """The query as a unit TF-IDF vector over the index's terms"""
+        np = numpy_module()
+        vector = np.zeros(len(self.terms), dtype=np.float32)
+        for term, count in Counter(term for term, _, _ in tokenize(query)).items():
+            column = self.terms.get(term)
+            if column is not None:
+                vector[column] = (1 + math.log(count)) * self.idf[column]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def search(self, query: str, limit: int = 10, section: Optional[str] = None, lsa: bool = True) -> Dict[str, Any]:
+        """Documents most similar to query by cosine similarity, in the latent space when lsa and there is one"""
+        np = numpy_module()
+        vector = self.vectorize(query)
+        lsa = lsa and self.has_latent_space
+        if lsa:
+            vector = self.components @ vector
+            norm = np.linalg.norm(vector)
+            vector = vector / norm if norm else vector
+            scores = self.latent @ vector
+        else:
+            scores = self.matrix @ vector
+
+        matching = scores > 0
+        if section is not None:
+            matching &= self.sections == section
+        candidates = np.flatnonzero(matching)
+        total = len(candidates)
+        if total > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        best = sorted(candidates.tolist(), key=lambda row: (-scores[row], row))
+
+        return {
+            "query": query,
+            "lsa": lsa,
+            "dimensions": self.dimensions if lsa else len(self.terms),
+            "total": total,
+            "hits": [
+                {
+                    "section": self.documents[row][0],
+                    "path": self.documents[row][1],
+                    "text": self.documents[row][2],
+                    "score": round(float(scores[row]), 4),
+                }
+                for row in best
+            ],
+        }
+
+
+def normalize_rows(matrix: Any) -> Any:
+    np = numpy_module()
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def build_semantic_index(data: Dict[str, Any]) -> Optional[SemanticIndex]:
+    """The semantic index of data, or None when NumPy is not installed"""
+    if numpy_module() is None:
+        return None
+    return SemanticIndex(data)
+
+
+class LazySemanticIndex:
+    """The semantic index of one data version, built on first use"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.built = False
+        self._index: Optional[SemanticIndex] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[SemanticIndex]:
+        """The index, built by the first caller (blocking) and shared after; None without NumPy"""
+        if not self.built:
+            with self._lock:
+                if not self.built:
+                    self._index = build_semantic_index(self.data)
+                    self.built = True
+        return self._index
@@ -0,0 +1,185 @@
+"""
+Snapshot generations shared between worker processes
+
+With `uvicorn --workers N` each worker would otherwise parse, validate and
+compress the same CV data and keep its own copy of every serialized
+response. Instead, the first worker to load a data version writes it as a
+generation file in a shared directory (ideally on tmpfs such as /dev/shm):
+the validated data (marshal) followed by every pre-serialized response body
+and its compressed variants. Every worker then maps the file read-only, so
+response bodies are served straight from one shared set of pages.
+
+A generation is written to a temporary name and published with a single
+rename, so it is either absent or complete. Builders take an exclusive lock
+per source file, so concurrent workers build a given version only once.
+Workers switch generations by swapping their current snapshot reference as
+usual. Only the newest `keep` generations of a source are left on disk,
+and with `max_bytes` the oldest generations of any source (such as tenants
+no worker has asked for lately) are removed until the directory fits;
+workers still mapping a removed one keep it alive until they drop it, and
+one that needs it again rebuilds it. Sources share a fixed set of lock
+files, so those do not accumulate either.
+"""
+
+import hashlib
+import logging
+import marshal
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, Optional
+
+from cache import CachedResponse
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; builds are then not deduplicated across workers
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CVGEN1\n"
+INDEX_SIZE = struct.Struct("<Q")
+
+# Builds of sources whose keys start with the same hex digit share a lock file
+LOCK_STRIPES = 16
+
+
+@dataclass
+class Generation:
+    """One data version as mapped from its generation file"""
+    version: str
+    data: Any
+    responses: Dict[Hashable, CachedResponse]
+    nbytes: int
+
+
+def source_key(source: Path) -> str:
+    """Short stable name for a source file, shared by all workers"""
+    return hashlib.sha256(str(source.resolve()).encode("utf-8")).hexdigest()[:16]
+
+
+class SharedStore:
+    """A directory of generation files shared by the workers on one host"""
+
+    def __init__(self, directory: Path, keep: int = 4, max_bytes: int = 0):
+        self.directory = directory
+        self.keep = max(1, keep)
+        # Total size of the generation files on disk (0: unbounded)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, source: Path, version: str) -> Path:
+        return self.directory / f"{source_key(source)}-{version}.gen"
+
+    @contextmanager
+    def lock(self, source: Path) -> Iterator[None]:
+        """Exclusive, cross-process lock for building generations of source"""
+        if fcntl is None:
+            yield
+            return
+        stripe = int(source_key(source)[0], 16) % LOCK_STRIPES
+        with open(self.directory / f"{stripe:x}.lock", "a+b") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def open(self, source: Path, version: str) -> Optional[Generation]:
+        """Map the published generation of source at version, if there is one"""
+        path = self.path_for(source, version)
+        try:
+            with open(path, "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        view = memoryview(mapped)
+        try:
+            if view[:len(MAGIC)] != MAGIC:
+                raise ValueError("bad magic")
+            index_start = len(MAGIC) + INDEX_SIZE.size
+            (index_length,) = INDEX_SIZE.unpack_from(view, len(MAGIC))
+            index = marshal.loads(view[index_start:index_start + index_length])
+            blobs = view[index_start + index_length:]
+
+            def blob(span):
+                offset, length = span
+                if offset + length > len(blobs):
+                    raise ValueError("truncated")
+                return blobs[offset:offset + length]
+
+            responses = {}
+            for key, media_type, spans in index["responses"]:
+                variants = {coding: blob(span) for coding, span in spans.items()}
+                responses[key] = CachedResponse(variants["identity"], media_type, variants)
+            return Generation(version, marshal.loads(blob(index["data"])), responses, len(mapped))
+        except (EOFError, ValueError, TypeError, KeyError, IndexError, struct.error) as e:
+            # Not a complete file as publish() writes them: treat it as
+            # absent, so the caller builds the generation and republishes it
+            logger.warning(f"Ignoring corrupt snapshot generation {path}: {e!r}")
+            return None
+
+    def publish(self, source: Path, version: str, data: Any, responses: Dict[Hashable, CachedResponse]) -> Path:
+        """Write the generation of source at version and prune old ones; call under lock()"""
+        chunks = []
+        offset = 0
+
+        def add(blob: bytes):
+            nonlocal offset
+            chunks.append(blob)
+            span = (offset, len(blob))
+            offset += len(blob)
+            return span
+
+        index = {
+            "data": add(marshal.dumps(data)),
+            "responses": [
+                (key, entry.media_type, {
+                    coding: add(bytes(variant))
+                    for coding, variant in (entry.variants or {"identity": entry.body}).items()
+                })
+                for key, entry in responses.items()
+            ],
+        }
+        encoded_index = marshal.dumps(index)
+
+        target = self.path_for(source, version)
+        temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as file:
+            file.write(MAGIC + INDEX_SIZE.pack(len(encoded_index)) + encoded_index)
+            for chunk in chunks:
+                file.write(chunk)
+        os.replace(temporary, target)
+        self._prune(source, target)
+        return target
+
+    def _prune(self, source: Path, newest: Path) -> None:
+        """Remove generations past keep for source, then the oldest of any source past max_bytes"""
+        generations = []
+        for path in self.directory.glob("*.gen"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            generations.append((path != newest, -stat.st_mtime_ns, stat.st_size, path))
+        generations.sort()
+
+        prefix = f"{source_key(source)}-"
+        kept = 0
+        total = 0
+        for not_newest, _, size, path in generations:
+            own = path.name.startswith(prefix)
+            over_budget = bool(self.max_bytes) and total + size > self.max_bytes
+            if not_newest and ((own and kept >= self.keep) or over_budget):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                continue
+            kept += own
+            total += size
@@ -0,0 +1,260 @@
+"""
+Immutable CV data snapshots and hot reloading
+
+A snapshot bundles the parsed CV data with everything derived from it
+(content hash, pre-serialized responses). Snapshots are built completely
+off the event loop and published with a single reference assignment, so a
+request either sees the old data or the new data, never a mix of both.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+import sections
+from cache import ResponseCache, encode_yaml
+from cv_loader import load_cv_bytes
+from experience import ExperienceStore
+from metrics import DATA_LOAD_SECONDS
+from models import CVDocument
+from search import SearchIndex
+from semantic import LazySemanticIndex
+from shared import SharedStore
+from suggest import SkillIndex
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class CVSnapshot:
+    """
+    One loaded version of the CV data and its derived caches
+
+    The data dict is shared by every request reading this snapshot and
+    must be treated as read-only.
+    """
+    data: Dict[str, Any]
+    version: str
+    source: Path
+    mtime: float
+    loaded_at: datetime
+    load_seconds: float
+    responses: ResponseCache
+    search_index: SearchIndex
+    skill_index: SkillIndex
+    # Built on the first semantic query
+    semantic_index: LazySemanticIndex
+    experience: ExperienceStore
+    collections: Dict[str, List[Any]]
+
+
+def find_data_file() -> Path:
+    """Locate cv-data.yml: $CV_DATA_FILE, then the Docker path, then the repository"""
+    configured = os.getenv("CV_DATA_FILE")
+    if configured:
+        return Path(configured)
+
+    docker_path = Path("/app/data/cv-data.yml")
+    local_path = Path(__file__).parent.parent / "data" / "cv-data.yml"
+
+    if docker_path.exists():
+        return docker_path
+    if local_path.exists():
+        return local_path
+    raise FileNotFoundError(f"CV data file not found at {docker_path} or {local_path}")
+
+
+def validate_cv_data(data: Any) -> Dict[str, Any]:
+    """
+    Validate parsed YAML against the CV models and return the validated data
+
+    Raises ValueError (pydantic's ValidationError is one) if it does not
+    match. The result is the models' JSON-mode dump, holding only the keys
+    present in the source.
+    """
+    if not isinstance(data, dict) or not data:
+        raise ValueError("CV data must be a non-empty mapping")
+    return CVDocument.model_validate(data).model_dump(mode="json", exclude_unset=True)
+
+
+def build_responses(version: str, data: Dict[str, Any], fast: bool = False) -> ResponseCache:
+    """A response cache for data, warmed with every section"""
+    responses = ResponseCache(version, compress=not fast)
+    for name in sections.SECTIONS:
+        responses.get(name, lambda name=name: sections.payload(name, data))
+    if not fast:
+        responses.get(sections.YAML_EXPORT, lambda: data, encode_yaml, sections.YAML_MEDIA_TYPE)
+    return responses
+
+
+def load_snapshot(path: Path, fast: bool = False, store: Optional[SharedStore] = None) -> CVSnapshot:
+    """
+    Parse, validate and fully build a snapshot of the CV data at path
+
+    This is blocking work and is meant to run in a worker thread. With fast
+    set, compression of the cached responses is left for a later
+    `responses.compress_entries()` and the YAML export is rendered on first
+    request, for the quickest possible cold start.
+
+    With a shared store, the data and responses come from the store's
+    generation for this version, which the first worker to need it builds
+    (always fully compressed) and publishes for the others.
+    """
+    started = time.perf_counter()
+    mtime = path.stat().st_mtime
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw)
+    version = digest.hexdigest()
+
+    generation = None
+    if store is not None:
+        try:
+            generation = store.open(path, version)
+            if generation is None:
+                with store.lock(path):
+                    generation = store.open(path, version)
+                    if generation is None:
+                        data = validate_cv_data(load_cv_bytes(raw, path, digest.digest()))
+                        store.publish(path, version, data, build_responses(version, data).entries())
+                        generation = store.open(path, version)
+        except OSError as e:
+            logger.warning(f"Shared snapshot store unavailable, loading {path} privately: {e}")
+
+    if generation is not None:
+        data = generation.data
+        responses = ResponseCache(version, entries=generation.responses)
+    else:
+        data = validate_cv_data(load_cv_bytes(raw, path, digest.digest()))
+        responses = build_responses(version, data, fast)
+
+    return CVSnapshot(
+        data=data,
+        version=version,
+        source=path,
+        mtime=mtime,
+        loaded_at=datetime.utcnow(),
+        load_seconds=time.perf_counter() - started,
+        responses=responses,
+        search_index=SearchIndex(data),
+        skill_index=SkillIndex(data),
+        semantic_index=LazySemanticIndex(data),
+        experience=ExperienceStore(data.get("experience", [])),
+        collections={name: build(data) for name, build in sections.COLLECTIONS.items()},
+    )
+
+
+class SnapshotHolder:
+    """
+    Holds the current snapshot of one CV data file and reloads it on change
+
+    `current` is only ever replaced wholesale, so readers just grab the
+    reference once per request and use it without locking. The last few
+    versions are retained in `history` so requests that refer to an
+    earlier version (pagination cursors) keep working across a reload.
+    """
+
+    def __init__(self, path: Path, history_size: int = 4, store: Optional[SharedStore] = None):
+        self.path = path
+        self.history_size = max(1, history_size)
+        self.store = store
+        self.current: Optional[CVSnapshot] = None
+        self.history: "OrderedDict[str, CVSnapshot]" = OrderedDict()
+        self.reload_count = 0
+        self.last_reload_seconds: Optional[float] = None
+        self.last_reload_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._lock = asyncio.Lock()
+
+    def _stat(self) -> Tuple[int, int]:
+        stat = self.path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _publish(self, snapshot: CVSnapshot) -> None:
+        self.history[snapshot.version] = snapshot
+        self.history.move_to_end(snapshot.version)
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+        self.current = snapshot
+
+    def snapshot_for(self, version: str) -> Optional[CVSnapshot]:
+        """A retained snapshot whose version starts with the given prefix"""
+        for full_version, snapshot in self.history.items():
+            if full_version.startswith(version):
+                return snapshot
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        """Version and reload statistics for the health endpoint"""
+        return {
+            "data_version": self.current.version if self.current else None,
+            "reloads": self.reload_count,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_reload_at": self.last_reload_at.isoformat() if self.last_reload_at else None,
+            "last_reload_error": self.last_error,
+        }
+
+    async def load(self, fast: bool = False) -> CVSnapshot:
+        """Load the data file for the first time; errors propagate"""
+        async with self._lock:
+            self._stamp = self._stat()
+            snapshot = await run_in_threadpool(load_snapshot, self.path, fast, self.store)
+            DATA_LOAD_SECONDS.labels("load").observe(snapshot.load_seconds)
+            self._publish(snapshot)
+            self.last_reload_seconds = snapshot.load_seconds
+            self.last_reload_at = snapshot.loaded_at
+            return snapshot
+
+    async def reload_if_changed(self) -> bool:
+        """
+        Reload when the file's mtime or size changed
+
+        A file that fails to parse or validate is logged and the previous
+        snapshot keeps serving. Returns True when a new version was swapped in.
+        """
+        async with self._lock:
+            try:
+                stamp = self._stat()
+            except OSError as e:
+                self.last_error = str(e)
+                logger.warning(f"Cannot stat CV data file {self.path}: {e}")
+                return False
+            if stamp == self._stamp:
+                return False
+            self._stamp = stamp
+
+            try:
+                snapshot = await run_in_threadpool(load_snapshot, self.path, False, self.store)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Reload of {self.path} failed, keeping previous data: {e}")
+                return False
+
+            DATA_LOAD_SECONDS.labels("reload").observe(snapshot.load_seconds)
+            self.last_error = None
+            if self.current is not None and snapshot.version == self.current.version:
+                return False
+
+            self._publish(snapshot)
+            self.reload_count += 1
+            self.last_reload_seconds = snapshot.load_seconds
+            self.last_reload_at = snapshot.loaded_at
+            logger.info(
+                f"Reloaded CV data from {self.path} (version {snapshot.version[:12]}, "
+                f"{snapshot.load_seconds * 1000:.1f} ms)"
+            )
+            return True
+
+    async def watch(self, interval: float) -> None:
+        """Poll the data file every interval seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            await self.reload_if_changed()
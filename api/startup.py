@@ -0,0 +1,112 @@
+"""
+Cold start helpers
+
+Startup is timed phase by phase and logged, and the OpenAPI schema can be
+generated at build time instead of on the first `/docs` request:
+
+    python api/startup.py [path/to/openapi.json]
+
+writes the schema of the app as configured by the current environment. At
+startup a prebuilt schema is only used while it lists exactly the routes
+the app has; otherwise FastAPI generates it on demand as usual.
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple, Union
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+OPENAPI_FILE = Path(os.getenv("CV_OPENAPI_FILE", Path(__file__).with_name("openapi.json")))
+
+
+class StartupTimer:
+    """Durations of the named startup phases, in order"""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def milliseconds(self) -> Dict[str, float]:
+        """Phase durations by name, for structured logs"""
+        return {name: round(seconds * 1000, 1) for name, seconds in self.phases}
+
+    def summary(self) -> str:
+        total = sum(seconds for _, seconds in self.phases)
+        parts = [f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.phases]
+        return f"{', '.join(parts)} (total {total * 1000:.1f} ms)"
+
+
+def route_signatures(app: FastAPI) -> Set[str]:
+    """`METHOD /path` of every documented route of app"""
+    return {
+        f"{method} {route.path_format}"
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.include_in_schema
+        for method in route.methods
+    }
+
+
+def schema_signatures(schema: dict) -> Set[str]:
+    return {
+        f"{method.upper()} {path}"
+        for path, operations in schema.get("paths", {}).items()
+        for method in operations
+    }
+
+
+def load_openapi(app: FastAPI, path: Path = OPENAPI_FILE) -> bool:
+    """Install the prebuilt schema at path if it matches app; True if it was used"""
+    try:
+        schema = json.loads(path.read_bytes())
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable OpenAPI schema {path}: {e}")
+        return False
+
+    if schema.get("info", {}).get("version") != app.version or schema_signatures(schema) != route_signatures(app):
+        logger.warning(f"Ignoring stale OpenAPI schema {path}; it will be generated on first use")
+        return False
+
+    app.openapi_schema = schema
+    return True
+
+
+def write_openapi(app: FastAPI, path: Union[str, Path] = OPENAPI_FILE) -> Path:
+    """Generate app's OpenAPI schema and write it to path"""
+    path = Path(path)
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(app.openapi(), ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(temporary, path)
+    return path
+
+
+def main() -> int:
+    from main import app
+
+    target = write_openapi(app, sys.argv[1] if len(sys.argv) > 1 else OPENAPI_FILE)
+    print(f"✓ Wrote OpenAPI schema for {len(route_signatures(app))} operations to {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
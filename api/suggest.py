@@ -0,0 +1,117 @@
+"""
+Skill autocomplete
+
+Every skill, certification and project technology is collected once per
+data version into a sorted list of normalized keys: the whole name plus the
+rest of the name from each later word ("vanilla js", "js"). A query's
+completions are then the contiguous run of keys it prefixes, found with one
+binary search, so a keystroke costs a bisect and a scan of the matching run
+rather than a pass over the CV.
+"""
+
+import heapq
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Key of each skills sub-list whose category is its parent's rather than its own
+CORE_SKILLS = "core"
+
+_word_start_re = re.compile(r"(?:^|(?<=[\s\-/_.(),]))\w")
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def word_suffixes(name: str) -> Iterator[Tuple[str, int]]:
+    """Yield (rest of name, offset) from the start of each word in a normalized name"""
+    for match in _word_start_re.finditer(name):
+        yield name[match.start():], match.start()
+
+
+@dataclass
+class Suggestion:
+    """One distinct name that can be suggested"""
+    text: str
+    categories: List[str] = field(default_factory=list)
+    count: int = 0
+
+
+def iter_skills(data: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """Yield (name, category) for every skill, certification and project technology"""
+    for group, sets in (data.get("skills") or {}).items():
+        if isinstance(sets, dict):
+            for name, items in sets.items():
+                category = group if name == CORE_SKILLS else name
+                for item in items or []:
+                    yield str(item), category
+        else:
+            for item in sets or []:
+                yield str(item), group
+    for certification in data.get("certifications") or []:
+        yield certification["name"], "certifications"
+    for project in data.get("projects") or []:
+        for technology in project.get("technologies") or []:
+            yield str(technology), "technologies"
+
+
+class SkillIndex:
+    """Sorted-prefix index of skill names for autocomplete"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.suggestions: List[Suggestion] = []
+        by_name: Dict[str, int] = {}
+        for text, category in iter_skills(data):
+            name = normalize(text)
+            if not name:
+                continue
+            if name not in by_name:
+                by_name[name] = len(self.suggestions)
+                self.suggestions.append(Suggestion(text))
+            suggestion = self.suggestions[by_name[name]]
+            suggestion.count += 1
+            if category not in suggestion.categories:
+                suggestion.categories.append(category)
+
+        # (key, suggestion id, 0 if the key is the whole name else 1), sorted by key
+        entries = sorted(
+            (key, suggestion_id, 1 if offset else 0)
+            for name, suggestion_id in by_name.items()
+            for key, offset in word_suffixes(name)
+        )
+        self.keys = [key for key, _, _ in entries]
+        self.entries = [(suggestion_id, word) for _, suggestion_id, word in entries]
+
+    def suggest(self, query: str, limit: int = 10, category: Optional[str] = None) -> Dict[str, Any]:
+        """Completions of query, best first: exact, then name prefix, then word prefix"""
+        prefix = normalize(query)
+        ranks: Dict[int, Tuple[int, int, int, str]] = {}
+        if prefix:
+            index = bisect_left(self.keys, prefix)
+            while index < len(self.keys) and self.keys[index].startswith(prefix):
+                suggestion_id, word = self.entries[index]
+                suggestion = self.suggestions[suggestion_id]
+                index += 1
+                if category is not None and category not in suggestion.categories:
+                    continue
+                tier = 0 if not word and self.keys[index - 1] == prefix else 1 + word
+                rank = (tier, -suggestion.count, len(suggestion.text), suggestion.text.lower())
+                if suggestion_id not in ranks or rank < ranks[suggestion_id]:
+                    ranks[suggestion_id] = rank
+
+        best = heapq.nsmallest(limit, ranks, key=ranks.__getitem__)
+        return {
+            "query": query,
+            "category": category,
+            "total": len(ranks),
+            "suggestions": [
+                {
+                    "text": self.suggestions[suggestion_id].text,
+                    "categories": self.suggestions[suggestion_id].categories,
+                    "count": self.suggestions[suggestion_id].count,
+                }
+                for suggestion_id in best
+            ],
+        }
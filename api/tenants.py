@@ -0,0 +1,231 @@
+"""
+Multi-tenant CV serving
+
+Each tenant is one YAML file in a directory (`<tenant>.yml`). Tenants are
+loaded on first access into their own SnapshotHolder and kept in an LRU
+bounded both by count and by estimated memory, so the process stays flat
+however many files exist.
+
+A tenant file that fails to load is remembered with its mtime and size, and
+requests get that error straight away until the file changes, rather than
+each re-reading and re-validating it.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from cache import encode_json
+from shared import SharedStore
+from snapshot import CVSnapshot, SnapshotHolder
+
+logger = logging.getLogger(__name__)
+
+# Tenant names double as file names, so keep them to a safe character set
+TENANT_PATTERN = r"^[a-z0-9][a-z0-9_-]{0,63}$"
+_tenant_re = re.compile(TENANT_PATTERN)
+
+# Parsed Python objects take several times the space of their JSON encoding
+PARSED_OVERHEAD = 6
+
+
+class TenantNotFound(LookupError):
+    """No data file exists for the requested tenant"""
+
+
+class TenantLoadError(Exception):
+    """The tenant's data file exists but could not be parsed or validated"""
+
+    def __init__(self, tenant: str, reason: str):
+        super().__init__(f"Tenant '{tenant}' could not be loaded: {reason}")
+        self.tenant = tenant
+        self.reason = reason
+
+
+def describe_error(error: Exception) -> str:
+    """A one-line account of why a data file failed to load"""
+    errors = getattr(error, "errors", None)
+    if callable(errors):
+        # pydantic's ValidationError: name each invalid field
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc']) or 'data'}: {detail['msg']}"
+            for detail in errors()
+        )
+    return f"{type(error).__name__}: {error}".splitlines()[0]
+
+
+@dataclass
+class _Entry:
+    holder: SnapshotHolder
+    nbytes: int
+    checked_at: float
+
+
+def estimate_bytes(snapshot: CVSnapshot) -> int:
+    """Rough resident size of a snapshot: its parsed data plus cached responses"""
+    # Read the entry directly: a lookup through get() would count as a cache
+    # hit and be reported in the access log of the request that loaded it
+    export = snapshot.responses.entries().get("export")
+    encoded_size = len(export.body) if export is not None else len(encode_json(snapshot.data))
+    return PARSED_OVERHEAD * encoded_size + snapshot.responses.nbytes
+
+
+class TenantRegistry:
+    """
+    Lazily loaded, LRU-evicted snapshot holders for every tenant's CV
+
+    Hits are served from memory; a tenant's file is re-checked for changes
+    at most every `check_interval` seconds. Concurrent first requests for
+    the same tenant share one load.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_tenants: int = 64,
+        max_bytes: int = 64 * 1024 * 1024,
+        check_interval: float = 2.0,
+        history_size: int = 4,
+        store: Optional[SharedStore] = None,
+    ):
+        self.directory = directory
+        self.max_tenants = max_tenants
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self.history_size = history_size
+        self.store = store
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._loading: Dict[str, "asyncio.Future[SnapshotHolder]"] = {}
+        # tenant -> (mtime_ns, size) of the file that failed, and why
+        self._failures: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_failures = 0
+
+    def path_for(self, tenant: str) -> Path:
+        if not _tenant_re.match(tenant):
+            raise TenantNotFound(tenant)
+        for suffix in (".yml", ".yaml"):
+            path = self.directory / f"{tenant}{suffix}"
+            if path.is_file():
+                return path
+        raise TenantNotFound(tenant)
+
+    async def get(self, tenant: str) -> SnapshotHolder:
+        """Return the tenant's loaded snapshot holder, loading it on a miss"""
+        entry = self._entries.get(tenant)
+        if entry is not None:
+            now = time.monotonic()
+            if now - entry.checked_at >= self.check_interval:
+                entry.checked_at = now
+                if not entry.holder.path.is_file():
+                    self._drop(tenant)
+                    raise TenantNotFound(tenant)
+                # Other loads run during the reload and may evict this tenant;
+                # only an entry still registered counts toward the budget
+                if await entry.holder.reload_if_changed() and self._entries.get(tenant) is entry:
+                    self._resize(tenant, entry)
+            if tenant in self._entries:
+                self._entries.move_to_end(tenant)
+            self.hits += 1
+            return entry.holder
+
+        self.misses += 1
+        pending = self._loading.get(tenant)
+        if pending is not None:
+            return await pending
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[tenant] = future
+        try:
+            try:
+                path = self.path_for(tenant)
+                stat = path.stat()
+            except (TenantNotFound, FileNotFoundError):
+                self._failures.pop(tenant, None)
+                raise TenantNotFound(tenant)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            failure = self._failures.get(tenant)
+            if failure is not None and failure[0] == stamp:
+                raise TenantLoadError(tenant, failure[1])
+
+            holder = SnapshotHolder(path, history_size=self.history_size, store=self.store)
+            try:
+                snapshot = await holder.load()
+            except Exception as e:
+                self.load_failures += 1
+                error = TenantLoadError(tenant, describe_error(e))
+                self._failures[tenant] = (stamp, error.reason)
+                logger.warning(f"Cannot load tenant '{tenant}' from {path}: {error.reason}")
+                raise error from e
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            self._failures.pop(tenant, None)
+            logger.info(
+                f"Loaded tenant '{tenant}' (version {snapshot.version[:12]}, "
+                f"{snapshot.load_seconds * 1000:.1f} ms)"
+            )
+            future.set_result(holder)
+            self._store(tenant, holder)
+            return holder
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._loading[tenant]
+
+    def _drop(self, tenant: str) -> None:
+        old = self._entries.pop(tenant, None)
+        if old is not None:
+            self.total_bytes -= old.nbytes
+
+    def _resize(self, tenant: str, entry: _Entry) -> None:
+        """Re-estimate a tenant's size after its data was reloaded"""
+        nbytes = sum(estimate_bytes(snapshot) for snapshot in entry.holder.history.values())
+        self.total_bytes += nbytes - entry.nbytes
+        entry.nbytes = nbytes
+        self._evict(keep=tenant)
+
+    def _store(self, tenant: str, holder: SnapshotHolder) -> None:
+        self._drop(tenant)
+        entry = _Entry(holder, 0, time.monotonic())
+        self._entries[tenant] = entry
+        self._resize(tenant, entry)
+
+    def _evict(self, keep: str) -> None:
+        """Evict the coldest tenants until within bounds, never evicting keep"""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_tenants or self.total_bytes > self.max_bytes
+        ):
+            evicted = next(iter(self._entries))
+            if evicted == keep:
+                self._entries.move_to_end(keep)
+                evicted = next(iter(self._entries))
+            cold = self._entries.pop(evicted)
+            self.total_bytes -= cold.nbytes
+            self.evictions += 1
+            logger.info(f"Evicted tenant '{evicted}' ({cold.nbytes} bytes)")
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for the health endpoint"""
+        return {
+            "loaded": len(self._entries),
+            "max_tenants": self.max_tenants,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "load_failures": self.load_failures,
+            "failed": len(self._failures),
+        }
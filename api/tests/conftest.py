@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+# The API's modules are imported top-level, as when running `uvicorn main:app` from api/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DATA_FILE = Path(__file__).resolve().parent.parent.parent / "data" / "cv-data.yml"
+
+
+@pytest.fixture(scope="session")
+def main_module():
+    """The app module, without the JSON log pipeline it installs on import"""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    import main
+    main.log_pipeline.stop()
+    root.handlers, root.level = handlers, level
+    return main
+
+
+@pytest.fixture
+def cv_file(tmp_path):
+    """A private copy of the CV data file"""
+    path = tmp_path / "cv-data.yml"
+    shutil.copy(DATA_FILE, path)
+    return path
+
+
+@pytest.fixture
+def holder(cv_file):
+    """A loaded snapshot holder of cv_file"""
+    from snapshot import SnapshotHolder
+
+    holder = SnapshotHolder(cv_file, history_size=4)
+    asyncio.run(holder.load())
+    return holder
+
+
+@pytest.fixture
+def edit_cv(holder):
+    """Replace text in the holder's data file and reload it; returns the new snapshot"""
+    def edit(old: str, new: str):
+        text = holder.path.read_text(encoding="utf-8")
+        assert old in text
+        holder.path.write_text(text.replace(old, new), encoding="utf-8")
+        stat = holder.path.stat()
+        os.utime(holder.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert asyncio.run(holder.reload_if_changed())
+        return holder.current
+
+    return edit
+
+
+@pytest.fixture
+def cv_client(holder):
+    """A client of the CV routes serving holder"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from routers.cv import create_router
+
+    app = FastAPI()
+    app.include_router(create_router(lambda: holder))
+    return TestClient(app)
@@ -0,0 +1,43 @@
+from cache import MIN_COMPRESS_SIZE, ResponseCache
+
+BODY = {"text": "x" * (MIN_COMPRESS_SIZE * 2)}
+
+
+def test_entries_are_built_once():
+    responses = ResponseCache("v1")
+    builds = []
+    for _ in range(3):
+        entry = responses.get("profile", lambda: builds.append(1) or BODY)
+    assert len(builds) == 1
+    assert "profile" in responses
+    assert (responses.hits, responses.misses) == (2, 1)
+    assert set(entry.variants) >= {"identity", "gzip"}
+
+
+def test_entries_past_the_limit_are_not_kept_or_compressed():
+    responses = ResponseCache("v1", max_entries=2)
+    for key in ("a", "b"):
+        responses.get(key, lambda: BODY)
+    nbytes = responses.nbytes
+
+    entry = responses.get("c", lambda: BODY)
+    assert entry.variants == {"identity": entry.body}
+    assert "c" not in responses
+    assert len(responses) == 2
+    assert responses.nbytes == nbytes
+
+
+def test_access_record_reports_outermost_lookup():
+    from logs import _access_record
+
+    responses = ResponseCache("v1")
+    responses.get("profile", lambda: BODY)
+    record = {"cache": None}
+    token = _access_record.set(record)
+    try:
+        responses.get(("batch", "profile"), lambda: responses.get("profile", lambda: BODY).body, bytes)
+        assert record["cache"] == "miss"
+        responses.get(("batch", "profile"), lambda: b"")
+        assert record["cache"] == "hit"
+    finally:
+        _access_record.reset(token)
@@ -0,0 +1,135 @@
+import copy
+import json
+import random
+
+import pytest
+
+from changes import diff, same
+
+
+def unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def apply(document, operations):
+    """Apply an RFC 6902 patch of add, remove and replace operations"""
+    document = copy.deepcopy(document)
+    for operation in operations:
+        tokens = [unescape(token) for token in operation["path"].split("/")[1:]]
+        if not tokens:
+            document = operation["value"]
+            continue
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = int(last)
+            if operation["op"] == "add":
+                parent.insert(index, operation["value"])
+            elif operation["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = operation["value"]
+        elif operation["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = operation["value"]
+    return document
+
+
+def test_same_distinguishes_json_types():
+    assert same({"a": [1, "x"]}, {"a": [1, "x"]})
+    assert not same(1, True)
+    assert not same(1, 1.0)
+    assert not same([0], [False])
+    assert not same({"a": 1}, {"a": 1, "b": None})
+
+
+def test_unchanged_data_has_an_empty_patch():
+    data = {"skills": {"core": ["Python", "R"]}, "projects": [{"name": "CV"}]}
+    assert diff(data, copy.deepcopy(data)) == []
+
+
+def test_entry_added_at_the_top_is_one_operation():
+    old = {"experience": [{"title": "B"}, {"title": "A"}]}
+    new = {"experience": [{"title": "C"}, {"title": "B"}, {"title": "A"}]}
+    assert diff(old, new) == [{"op": "add", "path": "/experience/0", "value": {"title": "C"}}]
+
+
+@pytest.mark.parametrize("old, new, operations", [
+    ({"a": 1}, {"a": 2}, [{"op": "replace", "path": "/a", "value": 2}]),
+    ({"a": 1}, {}, [{"op": "remove", "path": "/a"}]),
+    ({}, {"a/b": 1}, [{"op": "add", "path": "/a~1b", "value": 1}]),
+    ({"~": 1}, {"~": True}, [{"op": "replace", "path": "/~0", "value": True}]),
+    ([1, 2, 3, 4], [1, 4], [{"op": "remove", "path": "/1"}, {"op": "remove", "path": "/1"}]),
+    ([1], {"a": 1}, [{"op": "replace", "path": "", "value": {"a": 1}}]),
+])
+def test_operations(old, new, operations):
+    assert diff(old, new) == operations
+    assert apply(old, operations) == new
+
+
+def random_value(depth=0):
+    roll = random.random()
+    if depth > 3 or roll < 0.3:
+        return random.choice([1, 2, "a", "b", None, True, 1.5])
+    if roll < 0.65:
+        return [random_value(depth + 1) for _ in range(random.randint(0, 5))]
+    return {random.choice("xyz/~"): random_value(depth + 1) for _ in range(random.randint(0, 4))}
+
+
+def mutate(value):
+    value = copy.deepcopy(value)
+    if isinstance(value, list):
+        for _ in range(random.randint(0, 3)):
+            roll = random.random()
+            if roll < 0.3:
+                value.insert(random.randint(0, len(value)), random_value(2))
+            elif roll < 0.6 and value:
+                del value[random.randrange(len(value))]
+            elif value:
+                index = random.randrange(len(value))
+                value[index] = mutate(value[index])
+        return value
+    if isinstance(value, dict):
+        for key in list(value):
+            if random.random() < 0.3:
+                del value[key]
+            elif random.random() < 0.5:
+                value[key] = mutate(value[key])
+        if random.random() < 0.3:
+            value[random.choice("pq~/")] = random_value(2)
+        return value
+    return random_value(2) if random.random() < 0.5 else value
+
+
+def test_patch_turns_old_into_new():
+    random.seed(6902)
+    for _ in range(3000):
+        old = random_value()
+        new = mutate(old) if random.random() < 0.8 else random_value()
+        patched = apply(old, diff(old, new))
+        # Compared as JSON, where 1 and true differ
+        assert json.dumps(patched, sort_keys=True) == json.dumps(new, sort_keys=True), (old, new)
+
+
+def test_changes_since_a_previous_version_patch_its_export(holder, edit_cv, cv_client):
+    before = holder.current
+    old_export = cv_client.get("/export").json()
+    after = edit_cv("Curtin University", "Curtin Uni")
+
+    response = cv_client.get(f"/changes?since={before.version[:12]}")
+    assert response.status_code == 200
+    changes = response.json()
+    assert (changes["since"], changes["version"]) == (before.version, after.version)
+    assert changes["patch"]
+    assert all(operation["op"] == "replace" for operation in changes["patch"])
+    assert apply(old_export, changes["patch"]) == cv_client.get("/export").json()
+
+    current = cv_client.get(f"/changes?since={after.version}").json()
+    assert current["patch"] == []
+
+
+def test_changes_since_an_unknown_version_is_gone(cv_client):
+    assert cv_client.get("/changes?since=0123456789ab").status_code == 410
@@ -0,0 +1,120 @@
+from email.utils import formatdate
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from conditional import ConditionalMiddleware, check_not_modified, entity_tag, matching_tag, modified_since
+
+MTIME = 1_700_000_000
+LAST_MODIFIED = formatdate(MTIME, usegmt=True)
+
+
+@pytest.fixture
+def client():
+    def not_modified(request: Request) -> None:
+        check_not_modified(request, "v1", MTIME + 0.5)
+
+    app = FastAPI(dependencies=[Depends(not_modified)])
+
+    @app.get("/profile")
+    def profile():
+        return {"name": "Ada"}
+
+    @app.post("/profile")
+    def update():
+        return {"updated": True}
+
+    app.add_middleware(ConditionalMiddleware, cache_control="public, max-age=60")
+    return TestClient(app)
+
+
+def test_entity_tag_depends_on_version_path_and_query():
+    tag = entity_tag("v1", "/profile", "")
+    assert tag == entity_tag("v1", "/profile", "")
+    assert len({tag, entity_tag("v2", "/profile", ""), entity_tag("v1", "/skills", ""),
+                entity_tag("v1", "/profile", "a=1")}) == 4
+
+
+@pytest.mark.parametrize("header, matched", [
+    ('"abc"', '"abc"'),
+    ('W/"abc"', 'W/"abc"'),
+    ('"abc-br"', '"abc-br"'),
+    ('"other", W/"abc-gzip"', 'W/"abc-gzip"'),
+    ("*", '"abc"'),
+    ('"other"', None),
+    ('"abcd"', None),
+    ("", None),
+])
+def test_matching_tag(header, matched):
+    assert matching_tag(header, "abc") == matched
+
+
+@pytest.mark.parametrize("header, modified", [
+    (formatdate(MTIME, usegmt=True), False),
+    (formatdate(MTIME + 60, usegmt=True), False),
+    (formatdate(MTIME - 1, usegmt=True), True),
+    # Without a zone the date cannot be compared, nor when it is not a date
+    ("Tue, 14 Nov 2023 22:13:20", True),
+    ("yesterday", True),
+])
+def test_modified_since(header, modified):
+    assert modified_since(header, MTIME) is modified
+
+
+def test_response_carries_validators(client):
+    response = client.get("/profile")
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{entity_tag("v1", "/profile", "")}"'
+    assert response.headers["last-modified"] == LAST_MODIFIED
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+
+@pytest.mark.parametrize("if_none_match, echoed", [
+    ('"{tag}"', '"{tag}"'),
+    ('W/"{tag}"', 'W/"{tag}"'),
+    ('"{tag}-br"', '"{tag}-br"'),
+    ('"nope", "{tag}"', '"{tag}"'),
+    ("*", '"{tag}"'),
+])
+def test_if_none_match_answers_304(client, if_none_match, echoed):
+    tag = client.get("/profile").headers["etag"].strip('"')
+    response = client.get("/profile", headers={"If-None-Match": if_none_match.format(tag=tag)})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == echoed.format(tag=tag)
+    assert response.headers["last-modified"] == LAST_MODIFIED
+
+
+def test_stale_tag_gets_full_response(client):
+    response = client.get("/profile", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json() == {"name": "Ada"}
+
+
+def test_if_modified_since(client):
+    assert client.get("/profile", headers={"If-Modified-Since": LAST_MODIFIED}).status_code == 304
+    earlier = formatdate(MTIME - 3600, usegmt=True)
+    assert client.get("/profile", headers={"If-Modified-Since": earlier}).status_code == 200
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since(client):
+    headers = {"If-None-Match": '"stale"', "If-Modified-Since": LAST_MODIFIED}
+    assert client.get("/profile", headers=headers).status_code == 200
+
+    tag = client.get("/profile").headers["etag"]
+    earlier = formatdate(MTIME - 3600, usegmt=True)
+    assert client.get("/profile", headers={"If-None-Match": tag, "If-Modified-Since": earlier}).status_code == 304
+
+
+def test_query_string_is_part_of_the_tag(client):
+    tag = client.get("/profile?b=2&a=1").headers["etag"]
+    assert tag == client.get("/profile?a=1&b=2").headers["etag"]
+    assert client.get("/profile", headers={"If-None-Match": tag}).status_code == 200
+
+
+def test_unsafe_methods_are_not_conditional(client):
+    tag = client.get("/profile").headers["etag"]
+    response = client.post("/profile", headers={"If-None-Match": tag})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
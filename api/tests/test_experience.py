@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+
+from experience import ExperienceStore, classify, parse_date, parse_period
+from models import ExperienceType
+
+
+@pytest.mark.parametrize("period, expected", [
+    ("Feb 2016 – Present", (date(2016, 2, 1), None)),
+    ("Feb 2016 - Dec 2018", (date(2016, 2, 1), date(2018, 12, 1))),
+    ("2012—2014", (date(2012, 1, 1), date(2014, 12, 1))),
+    ("September 2001 – ongoing", (date(2001, 9, 1), None)),
+    ("2019", (date(2019, 1, 1), date(2019, 12, 1))),
+    ("Ongoing", (None, None)),
+    ("Sometime – 2010", (None, date(2010, 12, 1))),
+    ("", (None, None)),
+])
+def test_parse_period(period, expected):
+    assert parse_period(period) == expected
+
+
+def test_parse_date_rejects_other_text():
+    assert parse_date("Spring 2016") is None
+    assert parse_date("Feb. 2016") == date(2016, 2, 1)
+
+
+@pytest.mark.parametrize("entry, expected", [
+    ({"title": "Lecturer", "organization": "Curtin University"}, ExperienceType.academic),
+    ({"title": "Systems Engineer", "organization": "Submarine Systems Centre, RAN"}, ExperienceType.military),
+    ({"title": "Developer", "organization": "Self-Employed"}, ExperienceType.consulting),
+    ({"title": "Engineer", "organization": "Landgate"}, ExperienceType.industry),
+    # Keywords match whole words only ("ran" is not in "Grant")
+    ({"title": "Grant Writer", "organization": "Acme"}, ExperienceType.industry),
+    # An explicit type wins over keywords
+    ({"title": "Lecturer", "organization": "Navy", "type": "Consulting"}, ExperienceType.consulting),
+])
+def test_classify(entry, expected):
+    assert classify(entry) == expected
+
+
+ENTRIES = [
+    {"title": "Lecturer", "organization": "Curtin University", "period": "Feb 2016 – Present"},
+    {"title": "Consultant", "organization": "Bital IT Consulting Services", "period": "2010 – 2012"},
+    {"title": "Officer", "organization": "RAN", "period": "1990 – 1999"},
+    {"title": "Tutor", "organization": "  curtin   university ", "period": "2005 – 2008"},
+]
+
+
+@pytest.mark.parametrize("organization, titles", [
+    ("Curtin University", ["Lecturer", "Tutor"]),
+    ("curtin", ["Lecturer", "Tutor"]),
+    ("UNIV", ["Lecturer", "Tutor"]),
+    ("it consulting", ["Consultant"]),
+    ("ran", ["Officer"]),
+    ("urtin", []),
+    ("curtin college", []),
+])
+def test_filter_by_organization_word_prefix(organization, titles):
+    store = ExperienceStore(ENTRIES)
+    assert [entry["title"] for entry in store.filter(organization=organization)] == titles
+
+
+def test_filter_combines_organization_and_years():
+    store = ExperienceStore(ENTRIES)
+    assert [entry["title"] for entry in store.filter(organization="curtin", year_start=2015)] == ["Lecturer"]
+    assert [entry["title"] for entry in store.filter(year_end=1999)] == ["Officer"]
+    assert [entry["title"] for entry in store.filter(type=ExperienceType.academic, year_end=2009)] == ["Tutor"]
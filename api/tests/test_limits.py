@@ -0,0 +1,137 @@
+import asyncio
+
+import limits
+from limits import ConcurrencyLimiter, TokenBucketLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_admits_burst_then_limits(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(limits.time, "monotonic", clock)
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=3)
+
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == 1.0
+    assert limiter.limited == 1
+    # Other clients have their own buckets
+    assert limiter.acquire("b") == 0.0
+
+
+def test_token_bucket_refills_at_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(limits.time, "monotonic", clock)
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=1)
+
+    assert limiter.acquire("a") == 0.0
+    clock.now += 0.5
+    assert limiter.acquire("a") == 0.5
+    clock.now += 0.5
+    assert limiter.acquire("a") == 0.0
+
+
+def test_token_bucket_evicts_least_recently_seen(monkeypatch):
+    monkeypatch.setattr(limits.time, "monotonic", Clock())
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=1, max_clients=2)
+
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("a")
+    limiter.acquire("c")
+    assert limiter.stats()["clients"] == 2
+    assert limiter.evictions == 1
+    # b was evicted, so it starts again with a full bucket
+    assert limiter.acquire("b") == 0.0
+
+
+def test_concurrency_limiter_hands_slots_over_in_order():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=2, queue_timeout=1)
+        assert await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.stats()["waiting"] == 2
+
+        limiter.release()
+        assert await first
+        assert not second.done()
+        limiter.release()
+        assert await second
+        limiter.release()
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_limiter_sheds_when_queue_is_full():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=1, queue_timeout=1)
+        assert await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not await limiter.acquire()
+        assert limiter.rejected == 1
+        limiter.release()
+        assert await waiting
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_limiter_times_out_waiters():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=1, queue_timeout=0.01)
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        assert limiter.timed_out == 1
+        assert limiter.stats()["waiting"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_limiter_release_during_timeout_does_not_fail():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=1, queue_timeout=0.05)
+        assert await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter = limiter._waiters[0]
+
+        # Release as soon as the timeout has cancelled the waiter, before
+        # acquire() gets to remove it from the queue
+        while not waiter.cancelled():
+            await asyncio.sleep(0)
+        limiter.release()
+
+        assert await waiting is False
+        assert limiter.timed_out == 1
+        assert limiter.in_flight == 0
+        assert limiter.stats()["waiting"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_limiter_cancelled_waiter_popped_by_release():
+    async def scenario():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=1, queue_timeout=1)
+        assert await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        await asyncio.sleep(0)
+        limiter.release()
+        try:
+            await waiting
+        except asyncio.CancelledError:
+            pass
+        assert limiter.in_flight == 0
+        assert limiter.stats()["waiting"] == 0
+
+    asyncio.run(scenario())
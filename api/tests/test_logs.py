@@ -0,0 +1,55 @@
+import io
+import json
+import logging
+import queue
+
+from logs import DroppingQueueHandler, LogPipeline
+
+
+def write(pipeline: LogPipeline, *records: logging.LogRecord) -> list:
+    for record in records:
+        pipeline.handler.handle(record)
+    pipeline.stop()
+    return [json.loads(line) for line in pipeline.listener.handlers[0].stream.getvalue().splitlines()]
+
+
+def record(message: str, *args, exc_info=None, fields=None) -> logging.LogRecord:
+    entry = logging.LogRecord("test", logging.ERROR, __file__, 1, message, args, exc_info)
+    if fields is not None:
+        entry.fields = fields
+    return entry
+
+
+def test_exception_is_written_as_its_own_field():
+    pipeline = LogPipeline(stream=io.StringIO())
+    pipeline.start()
+    try:
+        raise ZeroDivisionError("boom")
+    except ZeroDivisionError as error:
+        failed = record("failed %s", "request", exc_info=(type(error), error, error.__traceback__))
+
+    (entry,) = write(pipeline, failed)
+    assert entry["message"] == "failed request"
+    assert entry["exception"].startswith("Traceback")
+    assert "ZeroDivisionError: boom" in entry["exception"]
+    # The queued copy holds no exception, and the caller's record is untouched
+    assert failed.exc_info is not None
+
+
+def test_records_are_formatted_on_the_writer_thread():
+    handler = DroppingQueueHandler(queue.Queue())
+    original = record("hello %s", "world", fields={"route": "/"})
+    handler.handle(original)
+
+    queued = handler.queue.get_nowait()
+    assert queued is not original
+    assert (queued.msg, queued.args, queued.fields) == ("hello %s", ("world",), {"route": "/"})
+
+
+def test_full_queue_drops_and_counts():
+    pipeline = LogPipeline(queue_size=1, stream=io.StringIO())
+    pipeline.handler.handle(record("first"))
+    pipeline.handler.handle(record("second"))
+    assert pipeline.stats()["dropped"] == 1
+    pipeline.start()
+    assert [entry["message"] for entry in write(pipeline)] == ["first"]
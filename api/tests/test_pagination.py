@@ -0,0 +1,61 @@
+import pytest
+from fastapi import HTTPException
+
+from pagination import decode_cursor, encode_cursor
+
+
+def walk(client, url, cursor=None):
+    """Every page from url (or from cursor on), as (items, cursors) lists"""
+    items, cursors = [], []
+    while True:
+        page = client.get(url + (f"&cursor={cursor}" if cursor else "")).json()
+        items.extend(page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, cursors
+        cursors.append(cursor)
+
+
+def test_cursor_round_trips():
+    cursor = encode_cursor("ab" * 32, 20, 10, "experience")
+    assert decode_cursor(cursor)[:3] == ("ab" * 8, 20, 10)
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "WzEsMl0", encode_cursor("v1", 0, 10, "x")[:-3]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+def test_pages_cover_the_collection_once(holder, cv_client):
+    items, cursors = walk(cv_client, "/experience?page_size=3")
+    assert items == holder.current.collections["experience"]
+    assert len(cursors) == (len(items) - 1) // 3
+
+
+def test_paging_survives_a_reload(holder, cv_client, edit_cv):
+    before = holder.current.collections["experience"]
+    first = cv_client.get("/experience?page_size=3").json()
+    after = edit_cv("Curtin University", "Curtin Uni").collections["experience"]
+    assert after != before
+
+    rest, _ = walk(cv_client, "/experience?page_size=3", first["next_cursor"])
+    assert first["data"] + rest == before
+    # A new walk reads the new version
+    assert walk(cv_client, "/experience?page_size=3")[0] == after
+
+
+def test_cursor_of_a_version_no_longer_retained_is_gone(holder, cv_client, edit_cv):
+    cursor = cv_client.get("/experience?page_size=3").json()["next_cursor"]
+    for number in range(holder.history_size):
+        edit_cv("Curtin University" if number == 0 else f"Curtin {number - 1}", f"Curtin {number}")
+
+    assert cv_client.get(f"/experience?page_size=3&cursor={cursor}").status_code == 410
+
+
+def test_cursor_belongs_to_its_query(cv_client):
+    cursor = cv_client.get("/experience?page_size=3").json()["next_cursor"]
+    response = cv_client.get(f"/experience?page_size=3&type=academic&cursor={cursor}")
+    assert response.status_code == 400
+    assert cv_client.get(f"/projects?page_size=3&cursor={cursor}").status_code == 400
@@ -0,0 +1,27 @@
+from search import MAX_POSTINGS_SCANNED, SearchIndex
+
+
+def make_index(projects: int) -> SearchIndex:
+    return SearchIndex({
+        "projects": [{"name": f"Python tool {number}", "description": "Python"} for number in range(projects)],
+        "teaching": [{"unit": "Introductory programming with Python and many other longer words"}],
+    })
+
+
+def test_section_filter_finds_postings_past_other_sections():
+    index = make_index(MAX_POSTINGS_SCANNED + 100)
+
+    # Only the section's own postings are scanned, not the projects' ahead of them
+    assert len(index.section_postings["teaching"]["python"]) == 1
+    result = index.search("python", section="teaching")
+    assert result["total"] == 1
+    assert result["hits"][0]["section"] == "teaching"
+    assert index.search("pyhton", section="teaching", fuzzy=True)["total"] == 1
+
+
+def test_postings_scanned_per_term_are_bounded():
+    index = make_index(MAX_POSTINGS_SCANNED + 100)
+
+    assert index.search("python")["total"] == MAX_POSTINGS_SCANNED
+    assert index.search("python", section="projects")["total"] == MAX_POSTINGS_SCANNED
+    assert index.search("python", section="skills")["total"] == 0
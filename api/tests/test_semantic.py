@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import semantic
+from semantic import LazySemanticIndex
+
+DATA = {
+    "experience": [
+        {"title": "Lecturer", "responsibilities": ["Taught machine learning", "Built CNN models for images"]},
+        {"title": "Developer", "responsibilities": ["Maintained web services"]},
+    ],
+    "projects": [{"name": "Classifier", "description": "Deep learning image classifier"}],
+}
+
+
+def test_index_is_built_once_on_first_use(monkeypatch):
+    pytest.importorskip("numpy")
+    builds = []
+    build = semantic.build_semantic_index
+    monkeypatch.setattr(semantic, "build_semantic_index", lambda data: builds.append(data) or build(data))
+
+    lazy_index = LazySemanticIndex(DATA)
+    assert not lazy_index.built and builds == []
+
+    with ThreadPoolExecutor(4) as pool:
+        indexes = list(pool.map(lambda _: lazy_index.get(), range(8)))
+    assert len(builds) == 1
+    assert all(index is indexes[0] for index in indexes)
+    hits = indexes[0].search("machine learning", lsa=False)["hits"]
+    assert [hit["path"] for hit in hits] == ["/experience/0/responsibilities/0", "/projects/0"]
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+def test_small_corpus_falls_back_to_tf_idf():
+    pytest.importorskip("numpy")
+    index = semantic.SemanticIndex(DATA)
+    assert not index.has_latent_space
+
+    result = index.search("web services")
+    assert result["lsa"] is False
+    assert [hit["path"] for hit in result["hits"]] == ["/experience/1/responsibilities/0"]
+    assert result["hits"][0]["score"] < 1.0
+
+
+def test_latent_space_ranks_related_documents():
+    pytest.importorskip("numpy")
+    topics = [
+        ("machine learning neural networks", "deep learning models"),
+        ("web services databases", "backend APIs"),
+        ("teaching curriculum students", "lecture design"),
+    ]
+    data = {
+        "experience": [
+            {"title": f"Role {number}", "responsibilities": [f"{first} {number}", f"{second} {number}"]}
+            for number in range(6)
+            for first, second in topics
+        ],
+    }
+    index = semantic.SemanticIndex(data)
+    assert index.has_latent_space
+
+    result = index.search("neural networks", limit=50)
+    assert result["lsa"] is True
+    scores = [hit["score"] for hit in result["hits"]]
+    assert scores == sorted(scores, reverse=True)
+    assert len(set(scores)) > 1
+    # Documents sharing no word with the query but the context of one rank above unrelated ones
+    related = [hit["score"] for hit in result["hits"] if "deep learning" in hit["text"]]
+    unrelated = [hit["score"] for hit in result["hits"] if "backend" in hit["text"]]
+    assert related and (not unrelated or min(related) > max(unrelated))
+
+
+def test_index_is_none_without_numpy(monkeypatch):
+    monkeypatch.setattr(semantic, "numpy_module", lambda: None)
+    lazy_index = LazySemanticIndex(DATA)
+    assert lazy_index.get() is None
+    assert lazy_index.built
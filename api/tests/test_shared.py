@@ -0,0 +1,95 @@
+import os
+from pathlib import Path
+
+from cache import CachedResponse
+from shared import SharedStore
+from snapshot import load_snapshot
+
+
+def publish(store, source, version, size=1000, mtime=None):
+    body = os.urandom(size)
+    target = store.publish(source, version, {"version": version}, {"export": CachedResponse(body, "application/json")})
+    if mtime is not None:
+        os.utime(target, ns=(mtime, mtime))
+    return target
+
+
+def test_publish_round_trips(tmp_path):
+    store = SharedStore(tmp_path / "shared")
+    source = tmp_path / "cv.yml"
+    publish(store, source, "v1")
+
+    generation = store.open(source, "v1")
+    assert generation.data == {"version": "v1"}
+    assert len(bytes(generation.responses["export"].body)) == 1000
+    assert store.open(source, "v2") is None
+
+
+def test_keeps_newest_generations_per_source(tmp_path):
+    store = SharedStore(tmp_path / "shared", keep=2)
+    source = tmp_path / "cv.yml"
+    for number in range(4):
+        publish(store, source, f"v{number}", mtime=number * 10**9)
+
+    assert store.open(source, "v3") is not None
+    assert store.open(source, "v2") is not None
+    assert store.open(source, "v1") is None
+    assert store.open(source, "v0") is None
+
+
+def test_bounds_directory_across_sources(tmp_path):
+    store = SharedStore(tmp_path / "shared", keep=4, max_bytes=3500)
+    tenants = [tmp_path / f"tenant-{number}.yml" for number in range(6)]
+    for number, source in enumerate(tenants):
+        publish(store, source, "v1", mtime=number * 10**9)
+
+    # The oldest sources' generations go first; the newest always stays
+    assert [store.open(source, "v1") is not None for source in tenants] == [False] * 3 + [True] * 3
+    total = sum(path.stat().st_size for path in store.directory.glob("*.gen"))
+    assert total <= 3500
+
+
+def test_lock_files_are_shared_between_sources(tmp_path):
+    store = SharedStore(tmp_path / "shared")
+    for number in range(100):
+        with store.lock(tmp_path / f"tenant-{number}.yml"):
+            pass
+    assert len(list(store.directory.glob("*.lock"))) <= 16
+
+
+def test_corrupt_generation_is_ignored(tmp_path):
+    store = SharedStore(tmp_path / "shared")
+    source = tmp_path / "cv.yml"
+    target = publish(store, source, "v1")
+    content = target.read_bytes()
+
+    for corrupt in (content[:len(content) // 2], content[:40], b"CVGEN1\n" + b"\xff" * 64, b"junk"):
+        target.write_bytes(corrupt)
+        assert store.open(source, "v1") is None
+
+
+def test_load_republishes_corrupt_generation(tmp_path):
+    data_file = Path(__file__).resolve().parent.parent.parent / "data" / "cv-data.yml"
+    source = tmp_path / "cv.yml"
+    source.write_bytes(data_file.read_bytes())
+    store = SharedStore(tmp_path / "shared")
+
+    def bodies(snapshot):
+        return {
+            (key, coding): bytes(variant)
+            for key, entry in snapshot.responses.entries().items()
+            for coding, variant in entry.variants.items()
+        }
+
+    first = load_snapshot(source, store=store)
+    expected = bodies(first)
+    (generation,) = store.directory.glob("*.gen")
+    truncated = generation.read_bytes()[:-100]
+    # Replace rather than rewrite the file, which the first snapshot still maps
+    generation.unlink()
+    generation.write_bytes(truncated)
+
+    second = load_snapshot(source, store=store)
+    assert second.data == first.data
+    assert bodies(second) == expected
+    assert store.open(source, first.version) is not None
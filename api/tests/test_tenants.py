@@ -0,0 +1,100 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from metrics import RESPONSE_CACHE_HIT
+from snapshot import SnapshotHolder, load_snapshot
+from tenants import PARSED_OVERHEAD, TenantLoadError, TenantRegistry, estimate_bytes
+
+DATA_FILE = Path(__file__).resolve().parent.parent.parent / "data" / "cv-data.yml"
+
+
+def test_estimate_bytes_is_not_a_cache_lookup():
+    snapshot = load_snapshot(DATA_FILE)
+    responses = snapshot.responses
+    before = (RESPONSE_CACHE_HIT.value, responses.hits, responses.misses, len(responses))
+
+    size = estimate_bytes(snapshot)
+    assert size == PARSED_OVERHEAD * len(responses.entries()["export"].body) + responses.nbytes
+    assert (RESPONSE_CACHE_HIT.value, responses.hits, responses.misses, len(responses)) == before
+
+
+def write_tenant(directory: Path, tenant: str, without_email: bool = False) -> Path:
+    text = DATA_FILE.read_text(encoding="utf-8")
+    if without_email:
+        lines = text.splitlines(keepends=True)
+        # Drop the first email, the one under personal:
+        index = next(number for number, line in enumerate(lines) if line.strip().startswith("email:"))
+        text = "".join(lines[:index] + lines[index + 1:])
+    path = directory / f"{tenant}.yml"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_invalid_tenant_is_remembered_until_its_file_changes(tmp_path, monkeypatch):
+    path = write_tenant(tmp_path, "bad", without_email=True)
+    registry = TenantRegistry(tmp_path)
+    loads = []
+    load = SnapshotHolder.load
+    monkeypatch.setattr(SnapshotHolder, "load", lambda holder, *args: loads.append(holder) or load(holder, *args))
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(TenantLoadError, match="personal.email"):
+                await registry.get("bad")
+        assert len(loads) == 1
+        assert registry.stats()["failed"] == 1
+
+        write_tenant(tmp_path, "bad")
+        os.utime(path, ns=(time.time_ns() + 10**9,) * 2)
+        holder = await registry.get("bad")
+        assert holder.current.data["personal"]["email"]
+        assert len(loads) == 2
+        assert registry.stats()["failed"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_invalid_tenant_is_answered_with_503(tmp_path, monkeypatch, main_module):
+    main = main_module
+    write_tenant(tmp_path, "bad", without_email=True)
+    monkeypatch.setattr(main, "tenant_registry", TenantRegistry(tmp_path))
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(main.tenant_holder("bad"))
+    assert raised.value.status_code == 503
+    assert "personal.email" in raised.value.detail
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(main.tenant_holder("missing"))
+    assert raised.value.status_code == 404
+
+
+def test_tenant_evicted_during_reload_is_not_resized(tmp_path):
+    for tenant in ("one", "two"):
+        write_tenant(tmp_path, tenant)
+    registry = TenantRegistry(tmp_path, check_interval=0)
+
+    async def scenario():
+        await registry.get("one")
+        entry = registry._entries["one"]
+        reload = entry.holder.reload_if_changed
+
+        async def reload_while_evicted():
+            # A concurrent load evicts "one" while its reload is in progress
+            registry._drop("one")
+            await registry.get("two")
+            await reload()
+            # The new version's size differs from the recorded one
+            entry.nbytes = 0
+            return True
+
+        entry.holder.reload_if_changed = reload_while_evicted
+        await registry.get("one")
+        assert "one" not in registry._entries
+        assert registry.total_bytes == registry._entries["two"].nbytes
+
+    asyncio.run(scenario())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API's time to first response from a cold start
+
+Starts uvicorn as a fresh process and times until it has answered both
+/profile and /openapi.json. Compares a plain start (YAML parsed, schema
+generated on demand, responses compressed before serving) with a fast
+start (compiled data snapshot, prebuilt OpenAPI schema, CV_FAST_STARTUP).
+
+Also reports the median of each startup phase the app logs. The fast start
+shortens the data phase; end to end, importing FastAPI, pydantic and
+uvicorn dominates, so the difference in time to first response is within
+run-to-run noise on most machines.
+"""
+
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+CV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cv-data.yml')
+
+sys.path.insert(0, API_DIR)
+
+from cv_loader import compile_snapshot  # noqa: E402
+
+RUNS = 5
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def startup_phases(output):
+    """Phase durations (ms) from the app's JSON startup log record"""
+    for line in output.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and "startup_ms" in record:
+            return record["startup_ms"]
+    return {}
+
+def time_to_first_response(env):
+    """Seconds from process start until /profile and /openapi.json both answer, and the startup phases"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=API_DIR, env={**os.environ, "LOG_LEVEL": "info", "ACCESS_LOG": "false", **env},
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        pending = ["/profile", "/openapi.json"]
+        while pending:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{pending[0]}", timeout=5) as response:
+                    response.read()
+                pending.pop(0)
+            except OSError:
+                if process.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                time.sleep(0.005)
+        seconds = time.perf_counter() - started
+    finally:
+        process.terminate()
+        output, _ = process.communicate()
+    return seconds, startup_phases(output)
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        plain_dir = os.path.join(workdir, "plain")
+        fast_dir = os.path.join(workdir, "fast")
+        os.makedirs(plain_dir)
+        os.makedirs(fast_dir)
+        shutil.copy(CV_FILE, plain_dir)
+        shutil.copy(CV_FILE, fast_dir)
+        compile_snapshot(os.path.join(fast_dir, "cv-data.yml"))
+
+        common = {"CV_RELOAD_INTERVAL": "0", "RATE_LIMIT_ENABLED": "false"}
+        openapi_file = os.path.join(fast_dir, "openapi.json")
+        subprocess.run(
+            [sys.executable, "startup.py", openapi_file],
+            cwd=API_DIR, env={**os.environ, **common}, check=True, stdout=subprocess.DEVNULL,
+        )
+
+        cases = [
+            ("plain start (before)", {
+                **common,
+                "CV_DATA_FILE": os.path.join(plain_dir, "cv-data.yml"),
+                "CV_OPENAPI_FILE": os.path.join(plain_dir, "missing.json"),
+                "CV_FAST_STARTUP": "false",
+            }),
+            ("fast start (after)", {
+                **common,
+                "CV_DATA_FILE": os.path.join(fast_dir, "cv-data.yml"),
+                "CV_OPENAPI_FILE": openapi_file,
+                "CV_FAST_STARTUP": "true",
+            }),
+        ]
+
+        print(f"Time to first response, median of {RUNS} cold starts")
+        baseline = None
+        phases = {}
+        for name, env in cases:
+            runs = [time_to_first_response(env) for _ in range(RUNS)]
+            seconds = statistics.median(seconds for seconds, _ in runs)
+            baseline = baseline or seconds
+            print(f"  {name:<25} {seconds * 1000:8.1f} ms  ({baseline / seconds:4.2f}x)")
+            phases[name] = {
+                phase: statistics.median(run[phase] for _, run in runs if phase in run)
+                for phase in runs[0][1]
+            }
+
+        print("Startup phases logged by the app (ms), median")
+        names = list(phases)
+        print(f"  {'phase':<12}" + "".join(f"{name:>25}" for name in names))
+        for phase in phases[names[0]]:
+            print(f"  {phase:<12}" + "".join(f"{phases[name].get(phase, 0):25.1f}" for name in names))
+
+if __name__ == "__main__":
+    main()
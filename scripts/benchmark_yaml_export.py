@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request cost of the API's /export?format=yaml
+
+Compares rendering with the pure-Python dumper on every request (the old
+behaviour), rendering with the libyaml dumper on every request, and serving
+the cached rendering the API now builds once per data version.
+"""
+
+import os
+import sys
+import timeit
+
+import yaml
+
+API_DIR = os.path.join(os.path.dirname(__file__), '..', 'api')
+sys.path.insert(0, API_DIR)
+
+from cache import ResponseCache, encode_yaml, yaml_dumper  # noqa: E402
+from cv_loader import load_cv_file  # noqa: E402
+
+def load_cv_data():
+    """Load CV data from YAML file"""
+    cv_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'cv-data.yml')
+    return load_cv_file(cv_file)
+
+def per_request_ms(func, number):
+    """Best-of-five mean time of one call, in milliseconds"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+def main():
+    cv_data = load_cv_data()
+    responses = ResponseCache("benchmark")
+    responses.get("yaml", lambda: cv_data, encode_yaml, "text/yaml")
+
+    cases = [
+        ("pure-Python yaml.dump per request (before)",
+         lambda: yaml.dump(cv_data, default_flow_style=False), 20),
+        (f"{yaml_dumper().__name__} per request",
+         lambda: encode_yaml(cv_data), 100),
+        ("cached rendering per request (after)",
+         lambda: responses.get("yaml", lambda: cv_data, encode_yaml, "text/yaml").to_response("gzip"), 10000),
+    ]
+
+    print(f"YAML export benchmark (libyaml available: {yaml.__with_libyaml__})")
+    baseline = None
+    for name, func, number in cases:
+        ms = per_request_ms(func, number)
+        baseline = baseline or ms
+        print(f"  {name:<45} {ms:10.4f} ms  ({baseline / ms:8.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,18 @@ Creates mock API responses for the API CV documentation interface
 import yaml
 import json
 import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+from cv_loader import load_cv_file  # noqa: E402
+
 def load_cv_data():
     """Load CV data from YAML file"""
     cv_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'cv-data.yml')
     
     try:
-        with open(cv_file, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        return load_cv_file(cv_file)
     except FileNotFoundError:
         print(f"Error: CV data file not found at {cv_file}")
         return None
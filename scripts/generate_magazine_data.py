@@ -3,15 +3,17 @@
 Generate Magazine CV data from cv-data.yml for the TechLife Magazine format
 """
 
-import yaml
 import json
 import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+from cv_loader import load_cv_file  # noqa: E402
+
 def load_cv_data():
     """Load CV data from YAML file"""
-    with open('data/cv-data.yml', 'r') as f:
-        return yaml.safe_load(f)
+    return load_cv_file('data/cv-data.yml')
 
 def create_magazine_content(cv_data):
     """Create magazine content from CV data"""
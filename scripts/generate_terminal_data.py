@@ -3,14 +3,16 @@
 Generate Terminal CV data from cv-data.yml for the Zork-like text adventure
 """
 
-import yaml
 import json
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+from cv_loader import load_cv_file  # noqa: E402
 
 def load_cv_data():
     """Load CV data from YAML file"""
-    with open('data/cv-data.yml', 'r') as f:
-        return yaml.safe_load(f)
+    return load_cv_file('data/cv-data.yml')
 
 def create_terminal_world(cv_data):
     """Create the terminal game world from CV data"""